@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Batch classifier: load a signal table once and classify every email in a single pass.
+
+Replaces the per-range extract_dXX / analyze_dXX script pairs. The whole signal
+file (001.xlsx, 002.csv, d1-d30.csv, ...) is read once, every row is classified
+as Malicious, Spam, Warning or No Action, and the verdicts are written in the
+existing [Data ID],[Classification] format (to predicted_outcome.csv unless -o is
+given, so the committed outcome.csv is never overwritten by default).
+"""
+
+import argparse
+import csv
+import os
+
+import pandas as pd
+
+from scoring_engine import CLASS_NAMES, FAST_PATH_HIT, label_names, score_table
+from outcome_index import discard_index, load_index, merge_index, pending_rows, save_index
+from pipeline_metrics import PipelineMetrics, add_metrics_arguments, file_size, metrics_from_args
+from rule_engine import policy_digest
+from signal_cache import open_cached_store
+from signal_loader import DEFAULT_CHUNK_SIZE, iter_signal_chunks, load_signal_table
+from signal_schema import DATA_ID
+from verdict_cache import VerdictCache, add_verdict_cache_argument, score_store_cached, score_table_cached
+
+DEFAULT_OUTPUT = 'predicted_outcome.csv'
+
+
+def classify_table(df, workers=1, stats=None, cache=None):
+    """Classify every row of a loaded signal table with the vectorized scoring engine.
+
+    With workers > 1 the rows are sharded across a process pool; the verdicts
+    are identical to the single-core path and stay in row order. With a
+    VerdictCache (verdict_cache.py), rows the fast path does not settle are
+    served from it first and only distinct uncached rows are evaluated (across
+    the process pool when workers > 1). If a stats dict is
+    given, 'rows' and 'fast_path' (rows settled by the hard-indicator fast
+    path) are added to it.
+    """
+    if cache is not None:
+        labels, hits = score_table_cached(df, cache, workers)
+    elif workers > 1:
+        from parallel_classify import score_table_parallel
+        labels, hits = score_table_parallel(df, workers)
+    else:
+        labels, hits = score_table(df)
+    if stats is not None:
+        stats['rows'] = stats.get('rows', 0) + len(df)
+        stats['fast_path'] = stats.get('fast_path', 0) + int(hits[FAST_PATH_HIT].sum())
+    return label_names(labels)
+
+
+def classify_store(store, workers=1, stats=None, cache=None):
+    """Classify every row of a SignalStore straight from its memory-mapped arrays (see classify_table)"""
+    if cache is not None:
+        labels, hits = score_store_cached(store, cache, workers)
+    else:
+        from parallel_classify import score_store_parallel
+        labels, hits = score_store_parallel(store, workers)
+    if stats is not None:
+        stats['rows'] = stats.get('rows', 0) + len(store)
+        stats['fast_path'] = stats.get('fast_path', 0) + int(hits[FAST_PATH_HIT].sum())
+    return label_names(labels)
+
+
+def write_outcome(data_ids, labels, output_path=DEFAULT_OUTPUT):
+    """Write verdicts as [Data ID],[Classification] lines, dropping the file's incremental index"""
+    discard_index(output_path)
+    with open(output_path, 'w', newline='') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        for data_id, label in zip(data_ids, labels):
+            writer.writerow([data_id, label])
+
+
+def update_outcome(output_path, data_ids, labels):
+    """Replace or append verdicts for data_ids in an outcome file.
+
+    Existing lines for other Data IDs keep their order (duplicates collapse to
+    the last verdict); the file is swapped in atomically.
+    """
+    rows = pd.DataFrame({DATA_ID: data_ids, 'Classification': labels})
+    if os.path.exists(output_path) and os.path.getsize(output_path):
+        existing = pd.read_csv(output_path, header=None, names=[DATA_ID, 'Classification'], dtype=str)
+        existing = existing.drop_duplicates(DATA_ID, keep='last')
+        rows = pd.concat([existing[~existing[DATA_ID].isin(rows[DATA_ID])], rows])
+
+    tmp_path = output_path + '.tmp'
+    rows.to_csv(tmp_path, header=False, index=False)
+    os.replace(tmp_path, output_path)
+
+
+def classify_incremental(source, output_path=DEFAULT_OUTPUT, workers=1, stats=None, metrics=None, cache=None):
+    """Classify only rows that are new or changed since the last incremental run.
+
+    The index of the last run is only used while it still matches the outcome
+    file, the source and the rule policy (outcome_index.py); otherwise every
+    row is classified.
+    Returns ({classification: count} for the rows classified now, number of rows skipped).
+    """
+    metrics = metrics or PipelineMetrics('batch_classify')
+    with metrics.stage('load', bytes_read=file_size(source)) as stage:
+        df = load_signal_table(source)
+        stage.rows += len(df)
+    with metrics.stage('select_pending', rows=len(df)):
+        known = load_index(output_path, source, policy_digest())
+        pending, ids, hashes = pending_rows(df, known)
+        todo = df[pending].reset_index(drop=True)
+
+    counts = {label: 0 for label in CLASS_NAMES}
+    if len(todo):
+        with metrics.stage('classify', rows=len(todo)):
+            labels = classify_table(todo, workers, stats, cache)
+        with metrics.stage('write', rows=len(todo)) as stage:
+            update_outcome(output_path, todo[DATA_ID], labels)
+            save_index(output_path, *merge_index(known, ids[pending], hashes[pending]), source, policy_digest())
+            stage.bytes_written += file_size(output_path)
+        counts = {label: int((labels == label).sum()) for label in CLASS_NAMES}
+    return counts, len(df) - len(todo)
+
+
+def classify_stream(source, output_path=DEFAULT_OUTPUT, chunk_size=DEFAULT_CHUNK_SIZE, workers=1, stats=None,
+                    metrics=None, cache=None):
+    """Classify a signal file chunk by chunk, appending verdicts as each chunk finishes.
+
+    Returns {classification: count}. Memory is bounded by chunk_size rows (plus
+    the verdict cache, which carries verdicts across chunks).
+    """
+    metrics = metrics or PipelineMetrics('batch_classify')
+    metrics.add('load', bytes_read=file_size(source))
+    counts = {label: 0 for label in CLASS_NAMES}
+    discard_index(output_path)
+    with open(output_path, 'w', newline='') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        for chunk in metrics.iterate('load', iter_signal_chunks(source, chunk_size)):
+            with metrics.stage('classify', rows=len(chunk)):
+                labels = classify_table(chunk, workers, stats, cache)
+            with metrics.stage('write', rows=len(chunk)):
+                writer.writerows(zip(chunk[DATA_ID], labels))
+            for label in CLASS_NAMES:
+                counts[label] += int((labels == label).sum())
+    metrics.add('write', bytes_written=file_size(output_path))
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Classify every email in a signal file in one pass')
+    parser.add_argument('source', nargs='?', default='001.xlsx', help='signal file (CSV or XLSX)')
+    parser.add_argument('-o', '--output', default=DEFAULT_OUTPUT, help='outcome file to write')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='always re-parse the source instead of using the columnar cache')
+    parser.add_argument('--chunk-size', type=int,
+                        help='stream the source in chunks of this many rows (for files larger than RAM)')
+    parser.add_argument('--workers', type=int, default=1, help='classify across this many processes')
+    parser.add_argument('--incremental', action='store_true',
+                        help='only classify Data IDs that are new or changed since the last incremental run')
+    add_verdict_cache_argument(parser)
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    stats = {}
+    metrics = metrics_from_args('batch_classify', args)
+    cache = VerdictCache(args.verdict_cache) if args.verdict_cache else None
+    if args.incremental:
+        counts, skipped = classify_incremental(args.source, args.output, args.workers, stats, metrics, cache)
+        print(f"{skipped} emails already classified in {args.output}")
+    elif args.chunk_size:
+        counts = classify_stream(args.source, args.output, args.chunk_size, args.workers, stats, metrics, cache)
+    else:
+        with metrics.stage('load', bytes_read=file_size(args.source)) as stage:
+            if args.no_cache:
+                table = load_signal_table(args.source, use_cache=False)
+                data_ids = table[DATA_ID]
+            else:
+                table = open_cached_store(args.source)
+                data_ids = table.data_ids
+            stage.rows += len(table)
+        with metrics.stage('classify', rows=len(table)):
+            if args.no_cache:
+                labels = classify_table(table, args.workers, stats, cache)
+            else:
+                labels = classify_store(table, args.workers, stats, cache)
+        with metrics.stage('write', rows=len(table)) as stage:
+            write_outcome(data_ids, labels, args.output)
+            stage.bytes_written += file_size(args.output)
+        counts = {label: int((labels == label).sum()) for label in CLASS_NAMES}
+    metrics.finish()
+
+    print(f"Classified {sum(counts.values())} emails from {args.source} -> {args.output}")
+    for label in CLASS_NAMES[::-1]:
+        print(f"  {label}: {counts[label]}")
+    if stats.get('rows'):
+        print(f"Fast path: {stats['fast_path']}/{stats['rows']} emails "
+              f"({stats['fast_path'] / stats['rows'] * 100:.1f}%) settled by hard indicators")
+    if cache is not None:
+        cache_stats = cache.stats()
+        print(f"Verdict cache: {cache_stats['hits']} rows served without evaluating the rules, "
+              f"{cache_stats['misses']} evaluated ({cache_stats['hit_rate'] * 100:.1f}% hits)")
+
+
+if __name__ == "__main__":
+    main()
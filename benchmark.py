@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Benchmark the load, classify and report stages on synthetic signal tables.
+
+Synthetic tables follow the per-column value distributions of 002.csv and the
+signal types of Detection_Signals_Essentials_1.0.csv, at any number of rows.
+Each stage is timed separately and recorded with its throughput and its own
+peak RSS (pipeline_metrics.reset_peak_rss) to benchmark_results.jsonl, one JSON
+line per (size, stage), tagged with the current git commit so runs can be
+compared. The synthetic table is generated and written out by one process and
+measured by another, so generating it is not charged to any stage. A size whose
+process dies or times out is reported as failed.
+
+    python benchmark.py --sizes 1000 100000
+    python benchmark.py --compare
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from pipeline_metrics import peak_rss_mb, reset_peak_rss
+from signal_loader import apply_schema, read_signal_file
+from signal_schema import CATEGORICAL, DATA_ID, FLOAT, load_schema
+
+REFERENCE_SAMPLE = '002.csv'
+RESULTS_FILE = 'benchmark_results.jsonl'
+DEFAULT_SIZES = [1_000, 100_000]
+
+# Seconds between checks that a benchmark process is still alive
+RESULT_POLL_SECONDS = 5
+
+# Rows generated per block, so 10M-row tables do not need a 10M-row temporary per column
+_GENERATE_BLOCK = 1_000_000
+
+
+def _column_sampler(column, dtype):
+    """Return sample(rng, n) drawing values with the distribution observed in a reference column"""
+    observed = column.dropna()
+    if dtype == FLOAT and len(observed):
+        values = observed.to_numpy(dtype=np.float64)
+        low, high = values.min(), values.max()
+
+        def sample(rng, n):
+            # Resample observed values with a little multiplicative jitter, kept inside the observed range
+            drawn = rng.choice(values, n) * rng.uniform(0.9, 1.1, n)
+            return np.clip(drawn, low, high)
+        return sample
+
+    labels, counts = np.unique(observed.astype(str) if dtype == CATEGORICAL else observed, return_counts=True)
+    probabilities = counts / counts.sum()
+
+    def sample(rng, n):
+        return rng.choice(labels, n, p=probabilities)
+    return sample
+
+
+def synthetic_table(rows, reference=REFERENCE_SAMPLE, seed=0):
+    """Signal table of the given size following the reference sample's value distributions"""
+    reference_df = read_signal_file(reference)
+    schema = load_schema()
+    samplers = {name: _column_sampler(reference_df[name], schema[name].dtype)
+                for name in reference_df.columns if name in schema}
+
+    rng = np.random.default_rng(seed)
+    blocks = []
+    for start in range(0, rows, _GENERATE_BLOCK):
+        n = min(_GENERATE_BLOCK, rows - start)
+        block = {DATA_ID: np.char.add('D', np.arange(start + 1, start + n + 1).astype(str))}
+        for name, sample in samplers.items():
+            block[name] = sample(rng, n)
+        blocks.append(apply_schema(pd.DataFrame(block)))
+    return pd.concat(blocks, ignore_index=True)
+
+
+def _timed(stage, rows, results, func, *args):
+    reset_peak_rss()
+    start = time.perf_counter()
+    value = func(*args)
+    seconds = time.perf_counter() - start
+    results.append({
+        'stage': stage,
+        'rows': rows,
+        'seconds': round(seconds, 6),
+        'rows_per_second': round(rows / seconds) if seconds else None,
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+    })
+    print(f"  {stage:<18} {seconds:10.3f}s  {results[-1]['rows_per_second'] or 0:>12,} rows/s  "
+          f"peak RSS {results[-1]['peak_rss_mb']:,.1f} MB")
+    return value
+
+
+def write_source(rows, path, results):
+    """Write a synthetic table as a CSV signal file (runs in its own process, see run_benchmarks)"""
+    synthetic_table(rows).to_csv(path, index=False)
+    results.put(True)
+
+
+def run_size(rows, source, results):
+    """Benchmark every stage on one synthetic signal file (runs in its own process so peak RSS is per size)"""
+    from batch_classify import classify_table
+    from report_builder import build_report, generate_reports
+    from signal_cache import load_cached_table
+
+    timings = []
+    workdir = os.path.dirname(source)
+    _timed('load_parse_csv', rows, timings, read_signal_file, source)
+    _timed('load_cache_build', rows, timings, load_cached_table, source)
+    table = _timed('load_cache_mmap', rows, timings, load_cached_table, source)
+    _timed('classify', rows, timings, classify_table, table)
+    report = _timed('report_build', rows, timings, build_report, table)
+    _timed('report_render', rows, timings, generate_reports, [report],
+           os.path.join(workdir, 'report.txt'), os.path.join(workdir, 'summary.csv'))
+    results.put(timings)
+
+
+def run_in_process(target, args, timeout=None):
+    """Run target(*args, results) in a fresh process; return (what it put on results or None, error or None)"""
+    results = multiprocessing.Queue()
+    process = multiprocessing.Process(target=target, args=(*args, results))
+    process.start()
+    deadline = None if timeout is None else time.monotonic() + timeout
+    value = None
+    while value is None:
+        try:
+            value = results.get(timeout=RESULT_POLL_SECONDS)
+        except queue.Empty:
+            if not process.is_alive():
+                # The process may have exited right after putting its result
+                try:
+                    value = results.get(timeout=1)
+                except queue.Empty:
+                    pass
+                break
+            if deadline is not None and time.monotonic() > deadline:
+                process.terminate()
+                process.join()
+                return None, f'timed out after {timeout:g}s'
+    process.join()
+    if process.exitcode != 0:
+        return None, f'exit code {process.exitcode}'
+    if value is None:
+        return None, 'no result'
+    return value, None
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(sizes, results_path=RESULTS_FILE, timeout=None):
+    """Benchmark each size and append its results; return the sizes that failed"""
+    run = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+    }
+    failed = []
+    with open(results_path, 'a') as f:
+        for rows in sizes:
+            print(f"{rows:,} rows:")
+            with tempfile.TemporaryDirectory() as workdir:
+                source = os.path.join(workdir, 'synthetic.csv')
+                _, error = run_in_process(write_source, (rows, source), timeout)
+                timings = None
+                if error is None:
+                    timings, error = run_in_process(run_size, (rows, source), timeout)
+            if error is not None:
+                print(f"  benchmark failed: {error}", file=sys.stderr)
+                failed.append(rows)
+                continue
+            for result in timings:
+                f.write(json.dumps({**run, **result}) + '\n')
+    return failed
+
+
+def compare_results(results_path=RESULTS_FILE):
+    """Print the latest run next to the previous one for every (rows, stage)"""
+    with open(results_path) as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    runs = sorted({record['timestamp'] for record in records})
+    if len(runs) < 2:
+        print("Need at least two benchmark runs to compare.")
+        return
+
+    previous, latest = runs[-2], runs[-1]
+    by_run = {(r['timestamp'], r['rows'], r['stage']): r for r in records}
+    print(f"{'rows':>12} {'stage':<18} {previous:>20} {latest:>20} {'change':>8}")
+    for (timestamp, rows, stage), record in sorted(by_run.items(), key=lambda item: (item[0][1], item[0][2])):
+        if timestamp != latest or (previous, rows, stage) not in by_run:
+            continue
+        before = by_run[(previous, rows, stage)]['seconds']
+        after = record['seconds']
+        change = f"{(after - before) / before * 100:+.0f}%" if before else 'n/a'
+        print(f"{rows:>12,} {stage:<18} {before:>19.3f}s {after:>19.3f}s {change:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark ingestion, classification and reporting')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='table sizes in rows')
+    parser.add_argument('--results', default=RESULTS_FILE, help='JSON-lines file the results are appended to')
+    parser.add_argument('--timeout', type=float, help='give up on a size after this many seconds per process')
+    parser.add_argument('--compare', action='store_true', help='compare the last two recorded runs instead')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare_results(args.results)
+        return 0
+    failed = run_benchmarks(args.sizes, args.results, args.timeout)
+    if failed:
+        print(f"Failed sizes: {', '.join(f'{rows:,}' for rows in failed)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""
+Bit-packed storage for the boolean detection signals.
+
+Every boolean signal in the catalog (sender_known_malicious, packer_detected,
+url_shortener_detected, ...) gets a fixed bit position, and an email's boolean
+signals are stored together in one or two uint64 words instead of a column
+each. "Any of these indicators set" is then one AND against a precomputed
+word mask per row.
+
+A bit is set when the signal is 1. Missing values and 0 both leave it clear.
+"""
+
+import numpy as np
+
+from signal_schema import BOOL, signals_of_type
+
+WORD_BITS = 64
+
+BOOL_SIGNALS = signals_of_type(BOOL)
+
+
+class BooleanPack:
+    """Boolean signals of n emails as an (n, words) uint64 array, bit i of the row = signals[i]"""
+
+    def __init__(self, words, signals):
+        self.words = words
+        self.signals = list(signals)
+        self.positions = {name: i for i, name in enumerate(self.signals)}
+
+    def __len__(self):
+        return self.words.shape[0]
+
+    @property
+    def nbytes(self):
+        return self.words.nbytes
+
+    def mask(self, names):
+        """Word mask with the bits of the given signals set; signals not in the pack are ignored"""
+        mask = np.zeros(self.words.shape[1], dtype=np.uint64)
+        for name in names:
+            position = self.positions.get(name)
+            if position is not None:
+                mask[position // WORD_BITS] |= np.uint64(1) << np.uint64(position % WORD_BITS)
+        return mask
+
+    def _rows(self, rows):
+        return self.words if rows is None else self.words[rows]
+
+    def any(self, mask, rows=None):
+        """Rows (all, or the given row indices) where at least one bit of mask is set"""
+        words = self._rows(rows)
+        if words.shape[1] == 1:
+            return (words[:, 0] & mask[0]) != 0
+        return ((words & mask) != 0).any(axis=1)
+
+    def all(self, mask, rows=None):
+        """Rows (all, or the given row indices) where every bit of mask is set"""
+        words = self._rows(rows)
+        if words.shape[1] == 1:
+            return (words[:, 0] & mask[0]) == mask[0]
+        return ((words & mask) == mask).all(axis=1)
+
+    def column(self, name):
+        """One signal unpacked as a uint8 0/1 array (zeros if it is not in the pack)"""
+        position = self.positions.get(name)
+        if position is None:
+            return np.zeros(len(self), dtype=np.uint8)
+        word, bit = divmod(position, WORD_BITS)
+        return ((self.words[:, word] >> np.uint64(bit)) & np.uint64(1)).astype(np.uint8)
+
+    def take(self, rows):
+        return BooleanPack(self.words[rows], self.signals)
+
+
+def pack_columns(columns, n, signals=BOOL_SIGNALS):
+    """Pack {signal: array} into a BooleanPack laid out as signals; missing signals stay 0"""
+    words = np.zeros((n, max(1, -(-len(signals) // WORD_BITS))), dtype=np.uint64)
+    for i, name in enumerate(signals):
+        values = columns.get(name)
+        if values is not None:
+            word, bit = divmod(i, WORD_BITS)
+            words[:, word] |= (np.asarray(values) == 1).astype(np.uint64) << np.uint64(bit)
+    return BooleanPack(words, signals)
+
+
+def pack_frame(df, signals=BOOL_SIGNALS):
+    """Pack the boolean signals of a signal table"""
+    return pack_columns({name: df[name].to_numpy() for name in signals if name in df.columns}, len(df), signals)
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Long-running classification service.
+
+The signal schema and the scoring rules are loaded once at startup, so each
+request only pays for turning its records into a SignalMatrix and evaluating
+the rules; no interpreter, pandas or workbook start-up per message.
+
+    python classify_service.py --port 8787
+    python classify_service.py --socket /run/email-classify.sock
+
+POST /classify with either
+  - JSON: one signal record ({"Data": "D1", "sender_known_malicios": 0, ...})
+    or a list of records; the response is {"results": [{"Data": ..., "classification": ...}]}
+  - CSV (Content-Type: text/csv): a header row plus one row per email; the
+    response is [Data ID],[Classification] lines, as in outcome.csv
+A record with a field that is no catalog signal, alias or Data ID, or without
+one of the signals the rules read (null is fine), gets a 400 that lists them
+under "unknown_fields" and "missing_signals".
+GET /health returns the number of signals loaded. A POST needs a Content-Length
+of at most MAX_BODY_SIZE bytes (411 if it is missing, 400 if it is not a
+non-negative integer, 413 if it is too large).
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import socketserver
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from scoring_engine import RecordError, build_record_matrix, check_records, label_names, required_signals, score_matrix
+from signal_schema import DATA_ID, load_schema
+from verdict_cache import VerdictCache, add_verdict_cache_argument
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8787
+
+# Largest request body accepted, in bytes
+MAX_BODY_SIZE = 64 << 20
+
+
+def classify_records(records, cache=None):
+    """Classify signal records (dicts); return [(Data ID or None, classification)].
+
+    Raises RecordError if a record has fields that are not signals or lacks a
+    signal the rules read. With a VerdictCache, records whose signal vector was
+    seen before are not evaluated again.
+    """
+    if not records:
+        return []
+    check_records(records)
+    m, data_ids = build_record_matrix(records)
+    labels, _ = cache.score(m) if cache is not None else score_matrix(m)
+    return list(zip(data_ids, label_names(labels)))
+
+
+def parse_csv_records(text):
+    records = list(csv.DictReader(io.StringIO(text)))
+    for line, record in enumerate(records, 2):
+        if None in record:
+            raise ValueError(f'line {line} has more cells than the header')
+    return records
+
+
+def parse_json_records(text):
+    payload = json.loads(text)
+    records = payload if isinstance(payload, list) else [payload]
+    if not all(isinstance(record, dict) for record in records):
+        raise ValueError('expected a JSON object or a list of objects')
+    return records
+
+
+class ClassifyHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def _send(self, status, body, content_type='application/json'):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(self, status, message):
+        self._send(status, json.dumps({'error': message}))
+
+    def _body_length(self):
+        """Validated Content-Length of the request, or None once an error has been sent.
+
+        The body cannot be framed without a valid length, so the connection is
+        closed after an error.
+        """
+        header = self.headers.get('Content-Length')
+        if header is None:
+            status, message = 411, 'Content-Length required'
+        elif not (header.strip().isascii() and header.strip().isdigit()):
+            status, message = 400, f'invalid Content-Length: {header!r}'
+        elif int(header) > MAX_BODY_SIZE:
+            status, message = 413, 'request body too large'
+        else:
+            return int(header)
+        self.close_connection = True
+        self._send_error(status, message)
+        return None
+
+    def do_GET(self):
+        if self.path == '/health':
+            health = {'status': 'ok', 'signals': len(load_schema())}
+            if self.server.verdict_cache is not None:
+                health['verdict_cache'] = self.server.verdict_cache.stats()
+            self._send(200, json.dumps(health))
+        else:
+            self._send_error(404, 'not found')
+
+    def do_POST(self):
+        if self.path != '/classify':
+            self._send_error(404, 'not found')
+            return
+        length = self._body_length()
+        if length is None:
+            return
+
+        is_csv = 'csv' in (self.headers.get('Content-Type') or '')
+        try:
+            text = self.rfile.read(length).decode('utf-8-sig')
+            records = parse_csv_records(text) if is_csv else parse_json_records(text)
+        except (ValueError, csv.Error) as exc:
+            self._send_error(400, str(exc))
+            return
+
+        try:
+            results = classify_records(records, self.server.verdict_cache)
+        except RecordError as exc:
+            self._send(400, json.dumps({'error': str(exc), 'unknown_fields': exc.unknown,
+                                        'missing_signals': exc.missing}))
+            return
+        if is_csv:
+            out = io.StringIO()
+            csv.writer(out, lineterminator='\n').writerows(results)
+            self._send(200, out.getvalue(), 'text/csv')
+        else:
+            self._send(200, json.dumps({'results': [{DATA_ID: data_id, 'classification': label}
+                                                    for data_id, label in results]}))
+
+    def address_string(self):
+        # Unix-socket peers have no host/port
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+        super().server_bind()
+        # BaseHTTPRequestHandler expects these on the server
+        self.server_name = 'localhost'
+        self.server_port = 0
+
+
+def make_server(host=DEFAULT_HOST, port=DEFAULT_PORT, socket_path=None, verbose=False, cache_entries=0):
+    """Create the HTTP server, with the schema and rules already loaded and warmed up.
+
+    cache_entries > 0 memoizes up to that many verdicts (verdict_cache.py).
+    """
+    load_schema()
+    classify_records([dict.fromkeys(required_signals())])
+
+    if socket_path:
+        server = UnixHTTPServer(socket_path, ClassifyHandler)
+    else:
+        server = ThreadingHTTPServer((host, port), ClassifyHandler)
+    server.verbose = verbose
+    server.verdict_cache = VerdictCache(cache_entries) if cache_entries else None
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve email classifications over HTTP')
+    parser.add_argument('--host', default=DEFAULT_HOST, help='address to listen on')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='TCP port to listen on')
+    parser.add_argument('--socket', help='listen on this Unix socket instead of TCP')
+    parser.add_argument('--verbose', action='store_true', help='log every request')
+    add_verdict_cache_argument(parser)
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.socket, args.verbose, args.verdict_cache)
+    where = args.socket or f'http://{args.host}:{args.port}'
+    print(f"Classification service listening on {where}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.socket and os.path.exists(args.socket):
+            os.unlink(args.socket)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,10 @@
 import pandas as pd
 
-# Read the extracted data
+from signal_schema import DATA_ID, canonical_columns
+
+# Read the extracted data, with column headers mapped to canonical signal names
 df = pd.read_csv('extracted_D56_D60_data.csv')
+df = df.rename(columns=canonical_columns(df.columns))
 
 # Create a readable text report
 with open('D56_D60_analysis_report.txt', 'w') as f:
@@ -12,22 +15,22 @@ with open('D56_D60_analysis_report.txt', 'w') as f:
     
     # For each email ID
     for idx, row in df.iterrows():
-        email_id = row['Data ']
+        email_id = row[DATA_ID]
         f.write(f'\n{"="*60}\n')
         f.write(f'EMAIL ID: {email_id}\n')
         f.write(f'{"="*60}\n\n')
         
         # Group signals for better readability
         signal_groups = {
-            'Sender Signals': ['sender_known_malicios', 'sender_domain_reputation_score', 
+            'Sender Signals': ['sender_known_malicious', 'sender_domain_reputation_score', 
                               'sender_spoof_detected', 'sender_temp_email_likelihood'],
-            'Authentication': ['dmarc_enforced', 'SPF_Pass', 'dkim_check_passed'],
+            'Authentication': ['dmarc_enforced', 'spf_result', 'dkim_result', 'dmarc_result'],
             'Attachment Analysis': ['packer_detected', 'any_file_hash_malicious', 
-                                   'max_metadata_suspicious_score', 'malicious_attachment_Count',
-                                   'unusual_file_extensions_count'],
-            'URL/Link Analysis': ['url_reputation_score', 'hyperlink_mismatch_count',
-                                 'url_shortener_count', 'link_rewritten_through_redirector',
-                                 'homoglyph_detected_in_URL']
+                                   'max_metadata_suspicious_score', 'malicious_attachment_count',
+                                   'has_executable_attachment'],
+            'URL/Link Analysis': ['url_reputation_score', 'url_redirect_chain_length',
+                                 'url_shortener_detected', 'link_rewritten_through_redirector',
+                                 'dns_morphing_detected']
         }
         
         # Print grouped signals
@@ -46,7 +49,7 @@ with open('D56_D60_analysis_report.txt', 'w') as f:
             printed_signals.update(group_signals)
         
         for col in df.columns:
-            if col != 'Data ' and col not in printed_signals:
+            if col != DATA_ID and col not in printed_signals:
                 value = row[col]
                 f.write(f'  - {col}: {value}\n')
         
@@ -57,10 +60,10 @@ print('Readable report created: D56_D60_analysis_report.txt')
 # Also create a summary showing non-zero/non-null values for each email
 print('\n=== SUMMARY OF NON-ZERO VALUES ===\n')
 for idx, row in df.iterrows():
-    email_id = row['Data ']
+    email_id = row[DATA_ID]
     non_zero_signals = []
     for col in df.columns:
-        if col != 'Data ':
+        if col != DATA_ID:
             value = row[col]
             if pd.notna(value) and value != 0 and value != '0':
                 non_zero_signals.append(f'{col}={value}')
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Data ID index: row offsets of emails by the numeric part of their Data ID.
+
+The index is built once when a signal store is written and saved next to it,
+so lookups never scan or string-match the Data ID column:
+  - single lookups ("D32") read one slot of a dense offset table when the IDs
+    are reasonably compact, and fall back to a binary search otherwise
+  - range queries ("D51-D55") binary-search the sorted ID numbers and return
+    only the offsets of the matching rows
+
+Extract rows by Data ID (replaces the extract_dXX scripts). The index only
+locates the rows; only those rows are then read from the source and written
+as they appear there, with its original headers and values, as the extract
+scripts wrote them:
+
+    python data_id_index.py 001.xlsx D51-D55 -o /tmp/D51_D55.csv
+"""
+
+import argparse
+import os
+import re
+
+import numpy as np
+
+NUMBERS_FILE = 'id_numbers.npy'
+ROWS_FILE = 'id_rows.npy'
+OFFSETS_FILE = 'id_offsets.npy'
+
+# The dense offset table is kept while it has at most this many slots per row
+DENSE_SPAN_FACTOR = 4
+
+ID_RANGE_PATTERN = re.compile(r'^\s*D?(\d+)\s*(?:-\s*D?(\d+)\s*)?$', re.IGNORECASE)
+
+
+def parse_id_range(text):
+    """Inclusive (first, last) Data ID numbers of 'D51-D55' or a single 'D32'"""
+    match = ID_RANGE_PATTERN.match(text)
+    if match is None:
+        raise ValueError(f"not a Data ID or range: {text!r}")
+    first, last = match.groups()
+    return int(first), int(last or first)
+
+
+class DataIdIndex:
+    """Data ID numbers sorted with their row offsets, plus an optional dense number -> offset table"""
+
+    def __init__(self, numbers, rows, offsets=None, base=0):
+        self.numbers = numbers
+        self.rows = rows
+        self.offsets = offsets
+        self.base = base
+
+    def __len__(self):
+        return len(self.numbers)
+
+    def lookup(self, data_id):
+        """Row offset of a Data ID ('D32' or 32), or None; the first row wins if an ID repeats"""
+        number = parse_id_range(data_id)[0] if isinstance(data_id, str) else int(data_id)
+        if self.offsets is not None:
+            slot = number - self.base
+            row = self.offsets[slot] if 0 <= slot < len(self.offsets) else -1
+            return None if row < 0 else int(row)
+        i = np.searchsorted(self.numbers, number)
+        if i < len(self.numbers) and self.numbers[i] == number:
+            return int(self.rows[i])
+        return None
+
+    def lookup_many(self, numbers):
+        """Row offsets (int64, -1 where absent) of an array of Data ID numbers, in one vectorized pass"""
+        numbers = np.asarray(numbers, dtype=np.int64)
+        found = np.full(len(numbers), -1, dtype=np.int64)
+        if self.offsets is not None:
+            slots = numbers - self.base
+            inside = (slots >= 0) & (slots < len(self.offsets))
+            found[inside] = self.offsets[slots[inside]]
+            return found
+        if len(self.numbers):
+            i = np.minimum(np.searchsorted(self.numbers, numbers), len(self.numbers) - 1)
+            hit = self.numbers[i] == numbers
+            found[hit] = self.rows[i[hit]]
+        return found
+
+    def range(self, first, last):
+        """Row offsets, in file order, of every row whose Data ID number is in [first, last]"""
+        lo = np.searchsorted(self.numbers, first, side='left')
+        hi = np.searchsorted(self.numbers, last, side='right')
+        return np.sort(self.rows[lo:hi])
+
+    def select(self, text):
+        """Row offsets for 'D51-D55' or 'D32'"""
+        return self.range(*parse_id_range(text))
+
+
+def build_index(numbers):
+    """DataIdIndex over an array of Data ID numbers (row i has numbers[i])"""
+    numbers = np.asarray(numbers, dtype=np.int64)
+    rows = np.argsort(numbers, kind='stable')
+    ordered = numbers[rows]
+    if not len(ordered):
+        return DataIdIndex(ordered, rows)
+
+    base = int(ordered[0])
+    span = int(ordered[-1]) - base + 1
+    offsets = None
+    if span <= DENSE_SPAN_FACTOR * len(ordered):
+        offsets = np.full(span, -1, dtype=np.int64)
+        # Assigned in reverse so the first row of a repeated ID is the one kept
+        offsets[ordered[::-1] - base] = rows[::-1]
+    return DataIdIndex(ordered, rows, offsets, base)
+
+
+def save_index(index, directory):
+    """Write an index into a directory; return the meta entries load_index needs"""
+    np.save(os.path.join(directory, NUMBERS_FILE), index.numbers, allow_pickle=False)
+    np.save(os.path.join(directory, ROWS_FILE), index.rows, allow_pickle=False)
+    if index.offsets is not None:
+        np.save(os.path.join(directory, OFFSETS_FILE), index.offsets, allow_pickle=False)
+    return {'id_base': index.base, 'id_dense': index.offsets is not None}
+
+
+def load_index(directory, meta):
+    """Memory-mapped DataIdIndex saved by save_index"""
+    def load(name):
+        return np.load(os.path.join(directory, name), mmap_mode='r')
+
+    offsets = load(OFFSETS_FILE) if meta['id_dense'] else None
+    return DataIdIndex(load(NUMBERS_FILE), load(ROWS_FILE), offsets, meta['id_base'])
+
+
+def main():
+    from signal_cache import open_cached_store
+    from signal_loader import read_raw_rows
+
+    parser = argparse.ArgumentParser(description='Extract emails from a signal file by Data ID or Data ID range')
+    parser.add_argument('source', help='signal file (CSV or XLSX)')
+    parser.add_argument('ids', help="Data ID or inclusive range, e.g. 'D32' or 'D51-D55'")
+    parser.add_argument('-o', '--output', help='write the rows to this CSV file instead of printing them')
+    args = parser.parse_args()
+
+    store = open_cached_store(args.source)
+    positions = store.source_positions(store.index.select(args.ids))
+    df = read_raw_rows(args.source, positions, store.meta['source_floats'])
+    if args.output:
+        df.to_csv(args.output, index=False)
+        print(f"Extracted {len(df)} emails ({args.ids}) from {args.source} -> {args.output}")
+    else:
+        print(df.T.to_string(header=False))
+
+
+if __name__ == "__main__":
+    main()
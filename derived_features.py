@@ -0,0 +1,93 @@
+"""
+Derived composite signals, computed once per dataset from the raw signals.
+
+The analysis scripts kept recomputing the same combinations row by row
+(comprehensive_analysis.py's SPF/DKIM/DMARC "auth_score", the bundle of
+known-malicious flags, ...). Each composite is defined here once as a
+vectorized function over a SignalMatrix:
+
+  auth_pass_count       SPF, DKIM and DMARC results that are 'pass' (0-3)
+  max_behavior_risk     largest of the sandbox, AMSI and exfiltration scores
+  any_known_malicious   1 if any known-malicious indicator is set
+  path_mismatch_score   share of the return-path / reply-path mismatch flags set
+
+Rules in rules.toml can test a composite by name like any catalog signal, and
+the report builder writes every composite as a summary CSV column. SignalMatrix
+computes a composite the first time it is read and keeps it for the rest of
+that matrix, so a composite costs nothing unless a rule or report uses it.
+Composites are float32; max_behavior_risk is NaN when all three scores are
+missing. Composites depend on the signals alone, never on the rule file:
+failed authentication is what the rule file's auth_failures set says, so it is
+tested there ("spf_result in auth_failures") rather than counted here.
+"""
+
+import numpy as np
+
+from signal_schema import encode_category, other_code
+
+AUTH_RESULTS = ['spf_result', 'dkim_result', 'dmarc_result']
+BEHAVIOR_SCORES = ['max_behavioral_sandbox_score', 'max_amsi_suspicion_score', 'max_exfiltration_behavior_score']
+KNOWN_MALICIOUS = [
+    'sender_known_malicious', 'return_path_known_malicious', 'reply_path_known_malicious',
+    'smtp_ip_known_malicious', 'domain_known_malicious', 'final_url_known_malicious', 'any_file_hash_malicious',
+]
+PATH_MISMATCHES = ['return_path_mismatch_with_from', 'reply_path_diff_from_sender']
+
+
+def _result_count(m, values):
+    count = np.zeros(len(m), dtype=np.float32)
+    for name in AUTH_RESULTS:
+        # Values outside a signal's dictionary (softfail for DKIM) share its "other" code, which must not count
+        codes = [encode_category(name, value) for value in values if encode_category(name, value) != other_code(name)]
+        count += np.isin(m.code(name), codes)
+    return count
+
+
+def auth_pass_count(m):
+    return _result_count(m, ['pass'])
+
+
+def max_behavior_risk(m):
+    # fmax skips NaN, so a missing score does not hide the others
+    return np.fmax.reduce([m.num(name) for name in BEHAVIOR_SCORES]).astype(np.float32)
+
+
+def any_known_malicious(m):
+    if m.booleans is not None:
+        return m.booleans.any(m.booleans.mask(KNOWN_MALICIOUS)).astype(np.float32)
+    return np.logical_or.reduce([m.flag(name) for name in KNOWN_MALICIOUS]).astype(np.float32)
+
+
+def path_mismatch_score(m):
+    return (np.sum([m.flag(name) for name in PATH_MISMATCHES], axis=0) / len(PATH_MISMATCHES)).astype(np.float32)
+
+
+# Derived feature name -> function of a SignalMatrix
+DERIVED_FEATURES = {
+    'auth_pass_count': auth_pass_count,
+    'max_behavior_risk': max_behavior_risk,
+    'any_known_malicious': any_known_malicious,
+    'path_mismatch_score': path_mismatch_score,
+}
+
+
+def derive(name, m):
+    """One derived feature of every row of a SignalMatrix as a float32 array"""
+    return DERIVED_FEATURES[name](m)
+
+
+def derived_block(m):
+    """Every derived feature of a SignalMatrix as an (n, len(DERIVED_FEATURES)) float32 matrix"""
+    block = np.empty((len(m), len(DERIVED_FEATURES)), dtype=np.float32, order='F')
+    for i, name in enumerate(DERIVED_FEATURES):
+        block[:, i] = m.num(name)
+    return block
+
+
+def add_derived_columns(df):
+    """A copy of a typed signal table with every derived feature appended as a column"""
+    # Imported here because scoring_engine resolves derived names through this module
+    from scoring_engine import build_signal_matrix
+
+    block = derived_block(build_signal_matrix(df))
+    return df.assign(**{name: block[:, i] for i, name in enumerate(DERIVED_FEATURES)})
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the email classification tools.
+
+    python email_cli.py classify 002.csv -o predicted_outcome.csv
+    python email_cli.py report 001.xlsx --range D86-D90
+    python email_cli.py extract 001.xlsx D51-D55
+    python email_cli.py serve --port 8787
+    python email_cli.py serve-batched --port 8788
+    python email_cli.py benchmark --sizes 1000
+    python email_cli.py evaluate outcome.csv --reference 001outcome.csv xlsxout.csv
+    python email_cli.py model predict 003.xlsx -o probabilities.csv
+
+Each subcommand imports its module only when it runs, so pandas, NumPy and
+openpyxl are loaded only by the code paths that use them. `classify` on a CSV
+file of up to quick_classify.SMALL_CSV_BYTES with no options besides -o runs
+on the standard library alone (quick_classify.py), with the same output, as
+long as rules.toml does not use derived features.
+"""
+
+import importlib
+import os
+import sys
+
+# Subcommand -> (module whose main() runs it, description)
+SUBCOMMANDS = {
+    'classify': ('batch_classify', 'classify every email in a signal file'),
+    'report': ('report_builder', 'build the detailed and summary reports'),
+    'extract': ('data_id_index', 'extract emails by Data ID or Data ID range'),
+    'serve': ('classify_service', 'run the HTTP classification service'),
+    'serve-batched': ('micro_batcher', 'run the micro-batching JSON-lines server'),
+    'benchmark': ('benchmark', 'benchmark the load, classify and report stages'),
+    'evaluate': ('evaluate_labels', 'compare verdicts against reference outcome files'),
+    'model': ('signal_model', 'train or apply the experimental probabilistic classifier'),
+}
+
+
+def usage():
+    lines = ['usage: email_cli.py <command> [options]', '', 'commands:']
+    lines += [f'  {name:<14} {description}' for name, (_, description) in SUBCOMMANDS.items()]
+    lines += ['', "Run 'email_cli.py <command> --help' for the options of a command."]
+    return '\n'.join(lines)
+
+
+def _quick_classify_args(args):
+    """Arguments for quick_classify.main if a classify call can skip pandas, else None"""
+    from quick_classify import policy_supported, small_csv
+
+    source, output, rest = None, [], list(args)
+    while rest:
+        arg = rest.pop(0)
+        if arg in ('-o', '--output') and rest:
+            output = [arg, rest.pop(0)]
+        elif arg.startswith('--output='):
+            output = [arg]
+        elif arg.startswith('-') or source is not None:
+            return None
+        else:
+            source = arg
+    # batch_classify's default source is a workbook
+    if source is None or not small_csv(source) or not policy_supported():
+        return None
+    return [source] + output
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ('-h', '--help'):
+        print(usage())
+        return 0
+    command, args = argv[0], argv[1:]
+    if command not in SUBCOMMANDS:
+        print(f"email_cli.py: unknown command {command!r}\n\n{usage()}", file=sys.stderr)
+        return 2
+
+    if command == 'classify':
+        quick_args = _quick_classify_args(args)
+        if quick_args is not None:
+            from quick_classify import main as quick_main
+            return quick_main(quick_args)
+
+    module = importlib.import_module(SUBCOMMANDS[command][0])
+    sys.argv = [f'{os.path.basename(sys.argv[0])} {command}'] + args
+    return module.main()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Label-agreement evaluation: compare classifier verdicts against reference outcome files.
+
+The verdicts (an outcome file, or the rules engine run on a signal file with
+--classify) are joined to each reference file by the numeric part of the Data
+ID. Each reference is loaded once into a DataIdIndex (a dense direct-address
+table when its IDs are compact) and every verdict is looked up in one
+vectorized pass, with no per-ID DataFrame filtering. For each reference the
+report gives:
+  - how many Data IDs joined, and how many are only in one of the two files
+  - a confusion matrix (rows: reference, columns: verdict), built with bincount
+  - per-class precision, recall and F1
+and --disagreements writes every Data ID where the verdict and a reference,
+or two references, disagree (outcome.csv, 001outcome.csv and xlsxout.csv
+already differ on D5 and D8).
+
+    python evaluate_labels.py outcome.csv --reference 001outcome.csv xlsxout.csv
+    python evaluate_labels.py --classify 001.xlsx --reference 001outcome.csv --min-agreement 0.9
+"""
+
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+from data_id_index import build_index
+from scoring_engine import CLASS_NAMES
+from signal_loader import data_id_numbers
+from signal_schema import DATA_ID
+
+MISSING_LABEL = -1
+
+
+def _label_codes(labels):
+    """Class codes of a categorical label column (-1 for missing or unknown labels)"""
+    lookup = {label: code for code, label in enumerate(CLASS_NAMES)}
+    # The trailing -1 is what missing values (category code -1) index
+    category_codes = [lookup.get(str(value).strip(), -1) for value in labels.cat.categories] + [-1]
+    return np.array(category_codes, dtype=np.int8)[labels.cat.codes.to_numpy()]
+
+
+def _id_numbers(data_ids):
+    """(Data ID numbers, mask of valid Data IDs) of a string column"""
+    if data_ids.str.startswith('D').all():
+        try:
+            return data_id_numbers(data_ids), np.ones(len(data_ids), dtype=bool)
+        except (TypeError, ValueError):
+            pass
+    # Headers, blank or malformed IDs: match each one
+    data_ids = data_ids.str.strip()
+    valid = data_ids.str.fullmatch(r'D\d+', na=False).to_numpy()
+    numbers = np.zeros(len(data_ids), dtype=np.int64)
+    numbers[valid] = data_id_numbers(data_ids[valid])
+    return numbers, valid
+
+
+def read_outcome(path):
+    """(Data ID numbers, label codes) of an outcome file; a repeated Data ID keeps its last verdict.
+
+    Lines whose first field is not a Data ID (headers) or whose label is not a
+    class name are skipped.
+    """
+    df = pd.read_csv(path, header=None, usecols=[0, 1], names=[DATA_ID, 'Classification'],
+                     dtype={DATA_ID: str, 'Classification': 'category'})
+    numbers, valid = _id_numbers(df[DATA_ID])
+    codes = _label_codes(df['Classification'])
+    keep = valid & (codes >= 0)
+    numbers, codes = numbers[keep], codes[keep]
+    last = ~pd.Series(numbers).duplicated(keep='last').to_numpy()
+    return numbers[last], codes[last]
+
+
+def classify_source(source, workers=1):
+    """(Data ID numbers, label codes) of the rules engine run over a signal file"""
+    from parallel_classify import score_store_parallel
+    from signal_cache import open_cached_store
+
+    store = open_cached_store(source)
+    labels, _ = score_store_parallel(store, workers)
+    numbers = np.empty(len(store), dtype=np.int64)
+    numbers[store.index.rows] = store.index.numbers
+    return numbers, labels.astype(np.int8)
+
+
+def join_labels(numbers, labels, reference_numbers, reference_labels):
+    """Reference label of every verdict (MISSING_LABEL where the reference has no such Data ID)"""
+    rows = build_index(reference_numbers).lookup_many(numbers)
+    joined = np.full(len(numbers), MISSING_LABEL, dtype=np.int8)
+    joined[rows >= 0] = reference_labels[rows[rows >= 0]]
+    return joined
+
+
+def confusion_matrix(reference, predicted):
+    """4x4 counts: rows are reference labels, columns predicted labels"""
+    k = len(CLASS_NAMES)
+    return np.bincount(reference.astype(np.int64) * k + predicted, minlength=k * k).reshape(k, k)
+
+
+def class_scores(confusion):
+    """{class: (precision, recall, f1, support)}; NaN where a class never occurs"""
+    hits = np.diag(confusion).astype(np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        precision = hits / confusion.sum(axis=0)
+        recall = hits / confusion.sum(axis=1)
+        f1 = 2 * precision * recall / (precision + recall)
+    return {label: (precision[i], recall[i], f1[i], int(confusion[i].sum())) for i, label in enumerate(CLASS_NAMES)}
+
+
+class Evaluation:
+    """Agreement of one set of verdicts with one reference file"""
+
+    def __init__(self, reference_path, reference_count, joined):
+        self.reference_path = reference_path
+        self.reference_count = reference_count
+        self.joined = joined
+
+    def matched(self):
+        return self.joined != MISSING_LABEL
+
+
+def evaluate(numbers, labels, reference_paths):
+    """One Evaluation per reference file, each joined to the verdicts by Data ID"""
+    evaluations = []
+    for path in reference_paths:
+        reference_numbers, reference_labels = read_outcome(path)
+        joined = join_labels(numbers, labels, reference_numbers, reference_labels)
+        evaluations.append(Evaluation(path, len(reference_numbers), joined))
+    return evaluations
+
+
+def _fmt(value):
+    return '   -' if value != value else f'{value:.3f}'
+
+
+def format_evaluation(evaluation, labels):
+    matched = evaluation.matched()
+    joined = int(matched.sum())
+    confusion = confusion_matrix(evaluation.joined[matched], labels[matched])
+    agreement = np.trace(confusion) / joined if joined else float('nan')
+    lines = [
+        f"Against {evaluation.reference_path}: {joined} joined, {len(labels) - joined} only in verdicts, "
+        f"{evaluation.reference_count - joined} only in reference",
+        f"  Agreement: {agreement * 100:.1f}%" if joined else "  Agreement: -",
+        "  Confusion (rows: reference, columns: verdict)",
+        '    ' + ' ' * 10 + ''.join(f'{label:>11}' for label in CLASS_NAMES),
+    ]
+    for i, label in enumerate(CLASS_NAMES):
+        lines.append(f'    {label:<10}' + ''.join(f'{count:>11}' for count in confusion[i]))
+    lines.append(f"  {'':<12}{'precision':>10}{'recall':>10}{'f1':>10}{'support':>10}")
+    for label, (precision, recall, f1, support) in class_scores(confusion).items():
+        lines.append(f"  {label:<12}{_fmt(precision):>10}{_fmt(recall):>10}{_fmt(f1):>10}{support:>10}")
+    return '\n'.join(lines), agreement
+
+
+def write_disagreements(path, numbers, labels, evaluations):
+    """Data ID, verdict and each reference's label for every row where any two of them differ"""
+    columns = np.column_stack([labels] + [evaluation.joined for evaluation in evaluations])
+    known = columns != MISSING_LABEL
+    # Smallest and largest known label per row; they differ exactly when two labels disagree
+    low = np.where(known, columns, len(CLASS_NAMES)).min(axis=1)
+    high = np.where(known, columns, MISSING_LABEL).max(axis=1)
+    rows = np.flatnonzero(high > low)
+    rows = rows[np.argsort(numbers[rows], kind='stable')]
+    names = np.append(CLASS_NAMES, '')
+    table = pd.DataFrame({DATA_ID: 'D' + pd.Series(numbers[rows]).astype(str), 'Verdict': names[labels[rows]]})
+    for i, evaluation in enumerate(evaluations, start=1):
+        table[evaluation.reference_path] = names[columns[rows, i]]
+    table.to_csv(path, index=False, lineterminator='\n')
+    return len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare verdicts against reference outcome files by Data ID')
+    parser.add_argument('verdicts', nargs='?', help='outcome file to evaluate')
+    parser.add_argument('--classify', metavar='SOURCE', help='evaluate the rules engine on this signal file instead')
+    parser.add_argument('--workers', type=int, default=1, help='classify across this many processes')
+    parser.add_argument('--reference', nargs='+', required=True, help='reference outcome files')
+    parser.add_argument('--disagreements', metavar='FILE', help='write the disagreeing Data IDs to this CSV file')
+    parser.add_argument('--min-agreement', type=float,
+                        help='exit with status 1 if the agreement with any reference is below this fraction')
+    args = parser.parse_args()
+    if (args.verdicts is None) == (args.classify is None):
+        parser.error('give either an outcome file or --classify SOURCE')
+
+    if args.classify:
+        numbers, labels = classify_source(args.classify, args.workers)
+        name = f'rules on {args.classify}'
+    else:
+        numbers, labels = read_outcome(args.verdicts)
+        name = args.verdicts
+    evaluations = evaluate(numbers, labels, args.reference)
+
+    print(f"Evaluated {len(labels)} verdicts ({name})")
+    failed = False
+    for evaluation in evaluations:
+        text, agreement = format_evaluation(evaluation, labels)
+        print(text)
+        if args.min_agreement is not None and not agreement >= args.min_agreement:
+            failed = True
+    if args.disagreements:
+        count = write_disagreements(args.disagreements, numbers, labels, evaluations)
+        print(f"{count} disagreeing Data IDs -> {args.disagreements}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Asyncio micro-batching front end for per-message classification requests.
+
+Single-email requests are collected for up to a short window (2 ms by default)
+or until a batch is full (256 messages), classified with one array-level
+call, and each caller's future is resolved with its own verdict. The
+classification runs in a worker thread so the next batch keeps filling while
+the previous one is scored.
+
+The server speaks JSON lines over TCP or a Unix socket: one signal record per
+line in, one {"Data": ..., "classification": ...} line out, in request order.
+Requests may be pipelined on a connection. A request that cannot be parsed,
+that has unknown fields or lacks a signal the rules read (as in
+classify_service.py), or whose batch fails to classify, gets an
+{"error": ...} line in its place.
+
+    python micro_batcher.py --port 8788 --window-ms 2 --max-batch 256
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+
+from classify_service import classify_records
+from scoring_engine import RecordError, check_records, required_signals
+from signal_schema import DATA_ID
+from verdict_cache import VerdictCache, add_verdict_cache_argument
+
+DEFAULT_WINDOW = 0.002
+DEFAULT_MAX_BATCH = 256
+DEFAULT_PORT = 8788
+
+# Responses queued per connection before the reader waits for the writer
+_PIPELINE_DEPTH = 1024
+
+
+class MicroBatcher:
+    """Collect single records into batches and classify each batch with one call"""
+
+    def __init__(self, classify=classify_records, window=DEFAULT_WINDOW, max_batch=DEFAULT_MAX_BATCH):
+        self.classify_batch = classify
+        self.window = window
+        self.max_batch = max_batch
+        self.batches = 0
+        self.messages = 0
+        self._pending = []
+        self._timer = None
+        self._running = set()
+
+    async def classify(self, record):
+        """Verdict for one record, as (Data ID or None, classification)"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((record, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        task = asyncio.ensure_future(self._run(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch):
+        self.batches += 1
+        self.messages += len(batch)
+        records = [record for record, _ in batch]
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(None, self.classify_batch, records)
+            if len(results) != len(batch):
+                raise RuntimeError(f'classifier returned {len(results)} verdicts for {len(batch)} records')
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, future), result in zip(batch, results):
+            # The caller may have been cancelled (e.g. disconnected) meanwhile
+            if not future.done():
+                future.set_result(result)
+
+    async def drain(self):
+        """Flush the pending batch and wait for every batch in flight"""
+        self._flush()
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+
+
+async def _respond(batcher, line):
+    try:
+        record = json.loads(line)
+        if not isinstance(record, dict):
+            raise ValueError('expected a JSON object')
+    except ValueError as exc:
+        return {'error': str(exc)}
+    try:
+        # A bad record is rejected on its own instead of failing its whole batch
+        check_records([record])
+    except RecordError as exc:
+        return {DATA_ID: record.get(DATA_ID), 'error': str(exc), 'unknown_fields': exc.unknown,
+                'missing_signals': exc.missing}
+    try:
+        data_id, label = await batcher.classify(record)
+    except Exception as exc:
+        # A failed batch answers each of its requests with an error; the connection stays up
+        return {DATA_ID: record.get(DATA_ID), 'error': f'classification failed: {exc}'}
+    return {DATA_ID: data_id, 'classification': label}
+
+
+async def _write_responses(writer, responses):
+    while True:
+        task = await responses.get()
+        if task is None:
+            break
+        writer.write(json.dumps(await task).encode('utf-8') + b'\n')
+        await writer.drain()
+
+
+async def handle_connection(batcher, reader, writer):
+    """Serve one JSON-lines connection, answering in request order"""
+    responses = asyncio.Queue(_PIPELINE_DEPTH)
+    writing = asyncio.ensure_future(_write_responses(writer, responses))
+    try:
+        async for line in reader:
+            if line.strip():
+                await responses.put(asyncio.ensure_future(_respond(batcher, line)))
+        await responses.put(None)
+        await writing
+    except (ConnectionError, asyncio.IncompleteReadError):
+        writing.cancel()
+    finally:
+        writer.close()
+
+
+async def serve(batcher, host='127.0.0.1', port=DEFAULT_PORT, socket_path=None):
+    def handler(reader, writer):
+        return handle_connection(batcher, reader, writer)
+
+    if socket_path:
+        server = await asyncio.start_unix_server(handler, socket_path)
+    else:
+        server = await asyncio.start_server(handler, host, port)
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-batching JSON-lines classification server')
+    parser.add_argument('--host', default='127.0.0.1', help='address to listen on')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='TCP port to listen on')
+    parser.add_argument('--socket', help='listen on this Unix socket instead of TCP')
+    parser.add_argument('--window-ms', type=float, default=DEFAULT_WINDOW * 1000,
+                        help='longest time a request waits for its batch to fill')
+    parser.add_argument('--max-batch', type=int, default=DEFAULT_MAX_BATCH, help='largest batch classified at once')
+    add_verdict_cache_argument(parser)
+    args = parser.parse_args()
+
+    # Load the schema and rules before the first request arrives
+    classify_records([dict.fromkeys(required_signals())])
+    cache = VerdictCache(args.verdict_cache) if args.verdict_cache else None
+    batcher = MicroBatcher(functools.partial(classify_records, cache=cache), args.window_ms / 1000, args.max_batch)
+    print(f"Micro-batching server listening on {args.socket or f'{args.host}:{args.port}'}")
+    try:
+        asyncio.run(serve(batcher, args.host, args.port, args.socket))
+    except KeyboardInterrupt:
+        pass
+    print(f"Classified {batcher.messages} emails in {batcher.batches} batches")
+    if cache is not None:
+        print(f"Verdict cache: {cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Index of already-classified Data IDs for incremental runs.
+
+The index lives next to the outcome file (outcome.csv -> outcome.csv.idx.npz)
+and holds two sorted arrays: the numeric Data IDs that have a verdict and a
+64-bit hash of the source row each verdict was computed from. A run then only
+classifies rows whose Data ID is new or whose row hash changed.
+
+The index also records what it describes: the outcome file's size, mtime and
+content digest when the index was saved, the absolute path of the source, and
+the digest of the policy the verdicts were computed under
+(rule_engine.policy_digest: rules.toml, the signal catalog and the engine
+version). It is only trusted while all of them still match (the outcome
+digest is only re-read when the mtime moved, as in signal_cache.py);
+otherwise it is ignored and every row is classified again. Writers that
+replace an outcome file wholesale drop its index with discard_index.
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from signal_cache import file_digest
+from signal_loader import data_id_numbers
+from signal_schema import DATA_ID
+
+INDEX_SUFFIX = '.idx.npz'
+
+
+def index_path(output_path):
+    return output_path + INDEX_SUFFIX
+
+
+def row_hashes(df):
+    """64-bit hash of every row's signal values (the Data ID itself is excluded)"""
+    return pd.util.hash_pandas_object(df.drop(columns=[DATA_ID]), index=False).to_numpy(dtype=np.uint64)
+
+
+def _empty():
+    return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.uint64)
+
+
+def _describes(meta, output_path, source, policy):
+    """Whether recorded index meta still matches the outcome file, the source and the policy"""
+    if source is not None and meta.get('source') != os.path.abspath(source):
+        return False
+    if policy is not None and meta.get('policy') != policy:
+        return False
+    try:
+        stat = os.stat(output_path)
+    except OSError:
+        return False
+    if meta.get('size') != stat.st_size:
+        return False
+    return meta.get('mtime_ns') == stat.st_mtime_ns or meta.get('digest') == file_digest(output_path)
+
+
+def load_index(output_path, source=None, policy=None):
+    """(sorted Data ID numbers, row hashes) recorded for an outcome file.
+
+    Empty if there is no index, or if it no longer describes the outcome file
+    (or, when given, the source file or the policy digest).
+    """
+    try:
+        with np.load(index_path(output_path)) as index:
+            meta = json.loads(str(index['meta']))
+            if not _describes(meta, output_path, source, policy):
+                return _empty()
+            return index['ids'], index['hashes']
+    except (OSError, ValueError, KeyError):
+        return _empty()
+
+
+def save_index(output_path, ids, hashes, source, policy):
+    """Atomically replace the index with the given ids/hashes, stamped with the current outcome file, source and
+    policy digest"""
+    stat = os.stat(output_path)
+    meta = {
+        'source': os.path.abspath(source),
+        'policy': policy,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'digest': file_digest(output_path),
+    }
+    order = np.argsort(ids, kind='stable')
+    tmp_path = index_path(output_path) + '.tmp.npz'
+    np.savez(tmp_path, ids=ids[order], hashes=hashes[order], meta=np.array(json.dumps(meta)))
+    os.replace(tmp_path, index_path(output_path))
+
+
+def discard_index(output_path):
+    """Drop the index of an outcome file that is being rewritten from scratch"""
+    try:
+        os.remove(index_path(output_path))
+    except FileNotFoundError:
+        pass
+
+
+def pending_rows(df, known):
+    """Boolean mask of rows that are new or changed since the last run, plus their ids and hashes.
+
+    known is the (ids, hashes) pair from load_index.
+    """
+    known_ids, known_hashes = known
+    ids = data_id_numbers(df[DATA_ID])
+    hashes = row_hashes(df)
+
+    unchanged = np.zeros(len(ids), dtype=bool)
+    if len(known_ids):
+        position = np.minimum(np.searchsorted(known_ids, ids), len(known_ids) - 1)
+        unchanged = (known_ids[position] == ids) & (known_hashes[position] == hashes)
+    return ~unchanged, ids, hashes
+
+
+def merge_index(known, ids, hashes):
+    """(ids, hashes) of a loaded index with new entries added, replacing those of ids already indexed"""
+    known_ids, known_hashes = known
+    keep = ~np.isin(known_ids, ids)
+    return np.concatenate([known_ids[keep], ids]), np.concatenate([known_hashes[keep], hashes])
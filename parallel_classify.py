@@ -0,0 +1,148 @@
+"""
+Multi-core classification over a process pool.
+
+The signal table is copied once into shared memory (numeric signals as a
+float32 block, boolean signals bit-packed into uint64 words, categorical
+signals as int8 dictionary codes) and every worker attaches to it, so shards
+are passed as row ranges instead of pickled DataFrames. Rows settled by the
+hard-indicator fast path never reach the pool. Results are written back by row
+range, which keeps the output in the original Data ID order and identical to
+the single-core path.
+
+A table that is already in a signal store (signal_store.py) needs no shared
+memory at all: score_store_parallel has every worker memory-map the store and
+score its row ranges in place.
+"""
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from bitpack import BOOL_SIGNALS, BooleanPack, pack_frame
+from scoring_engine import (FAST_PATH_HIT, SignalMatrix, build_category_block, build_numeric_block, category_columns,
+                            numeric_columns, score_matrix, score_table, settle_fast_path)
+from signal_store import SignalStore
+
+# Shards per worker; more than one evens out uneven shards
+SHARDS_PER_WORKER = 4
+
+# Per-worker views onto the shared blocks, set by _init_worker
+_worker = {}
+
+
+def _to_shared(array):
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+    view[...] = array
+    return shm
+
+
+def _attach(name, shape, dtype):
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _init_worker(layout):
+    values_shm, values = _attach(*layout['values'])
+    words_shm, words = _attach(*layout['booleans'])
+    codes_shm, codes = _attach(*layout['codes'])
+    _worker.update(
+        blocks=(values_shm, words_shm, codes_shm),
+        numeric=numeric_columns(values, layout['columns']),
+        words=words,
+        codes=codes,
+    )
+
+
+def _score_shard(start, stop):
+    categorical = category_columns(_worker['codes'][start:stop])
+    booleans = BooleanPack(_worker['words'][start:stop], BOOL_SIGNALS)
+    numeric = {name: values[start:stop] for name, values in _worker['numeric'].items()}
+    m = SignalMatrix(numeric, categorical, booleans)
+    labels, _ = score_matrix(m)
+    return start, stop, labels
+
+
+def _init_store_worker(directory):
+    _worker.update(store=SignalStore(directory))
+
+
+def _score_store_shard(start, stop):
+    labels, hits = score_matrix(_worker['store'].matrix(start, stop))
+    return start, stop, labels, hits[FAST_PATH_HIT]
+
+
+def score_store_parallel(store, workers=None):
+    """Score a SignalStore across a process pool; return (label codes in row order, {FAST_PATH_HIT: mask}).
+
+    Each worker memory-maps the store itself, so nothing is copied or pickled
+    besides the row ranges and the resulting labels.
+    """
+    workers = workers or os.cpu_count() or 1
+    n = len(store)
+    if workers <= 1 or n == 0:
+        labels, hits = score_matrix(store.matrix())
+        return labels, {FAST_PATH_HIT: hits[FAST_PATH_HIT]}
+
+    shard_size = math.ceil(n / (workers * SHARDS_PER_WORKER))
+    result = np.empty(n, dtype=np.int8)
+    settled = np.empty(n, dtype=bool)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_store_worker,
+                             initargs=(store.directory,)) as pool:
+        futures = [pool.submit(_score_store_shard, start, min(start + shard_size, n))
+                   for start in range(0, n, shard_size)]
+        for future in futures:
+            start, stop, labels, fast = future.result()
+            result[start:stop] = labels
+            settled[start:stop] = fast
+    return result, {FAST_PATH_HIT: settled}
+
+
+def score_table_parallel(df, workers=None):
+    """Score a signal table across a process pool; return (label codes in row order, {FAST_PATH_HIT: mask}).
+
+    Rows settled by the fast path are labelled here; only the rest are
+    copied to shared memory and sharded across the workers.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(df) == 0:
+        labels, hits = score_table(df)
+        return labels, {FAST_PATH_HIT: hits[FAST_PATH_HIT]}
+
+    settled, code = settle_fast_path(df)
+    result = np.full(len(df), code, dtype=np.int8)
+    rest = np.flatnonzero(~settled)
+    if len(rest):
+        result[rest] = _score_rows_parallel(df.iloc[rest] if settled.any() else df, workers)
+    return result, {FAST_PATH_HIT: settled}
+
+
+def _score_rows_parallel(df, workers):
+    n = len(df)
+    values, columns = build_numeric_block(df)
+    words = pack_frame(df).words
+    codes = build_category_block(df)
+    blocks = [_to_shared(values), _to_shared(words), _to_shared(codes)]
+    try:
+        layout = {
+            'values': (blocks[0].name, values.shape, values.dtype),
+            'booleans': (blocks[1].name, words.shape, words.dtype),
+            'codes': (blocks[2].name, codes.shape, codes.dtype),
+            'columns': columns,
+        }
+        shard_size = math.ceil(n / (workers * SHARDS_PER_WORKER))
+        result = np.empty(n, dtype=np.int8)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(layout,)) as pool:
+            futures = [pool.submit(_score_shard, start, min(start + shard_size, n))
+                       for start in range(0, n, shard_size)]
+            for future in futures:
+                start, stop, labels = future.result()
+                result[start:stop] = labels
+        return result
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
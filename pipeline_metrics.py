@@ -0,0 +1,254 @@
+"""
+Per-stage instrumentation for pipeline runs (batch classification, reports).
+
+A run is split into named stages (load, classify, write, ...). Each stage
+records wall and CPU time, rows, bytes read and written and its own peak RSS.
+Stages may nest or be entered several times (once per chunk, say): times are
+exclusive, so a stage's seconds do not include the stages running inside it,
+and repeated entries add up.
+
+Peak RSS is per stage on Linux: the kernel's high-water mark (VmHWM) is reset
+through /proc/self/clear_refs when a stage starts and read when it ends, so a
+stage is not charged for memory an earlier stage used. A stage's peak covers
+the stages nested in it. Where the mark cannot be reset (other platforms), the
+value falls back to the process peak so far.
+
+When the run finishes, every stage is written as one JSON line, followed by a
+'total' line, and optionally as Prometheus text (a node_exporter textfile). With a
+profile directory, each stage runs under its own cProfile profiler and its
+stats are dumped to <command>-<stage>.prof plus a readable .txt summary.
+"""
+
+import contextlib
+import cProfile
+import io
+import json
+import os
+import pstats
+import resource
+import sys
+import time
+import uuid
+
+PROFILE_LINES = 30
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process since the last reset_peak_rss (or since it started), in MB"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1 << 20) if sys.platform == 'darwin' else peak / 1024
+
+
+def reset_peak_rss():
+    """Reset the peak RSS to the current RSS; return False where that is not possible"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        return False
+    return True
+
+
+def file_size(path):
+    """Size of a file in bytes, or 0 if it does not exist"""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+class Stage:
+    """Accumulated measurements of one named stage"""
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.rows = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.peak_rss_mb = 0.0
+        self.profiler = None
+
+    def record(self):
+        return {
+            'stage': self.name,
+            'calls': self.calls,
+            'seconds': round(self.seconds, 6),
+            'cpu_seconds': round(self.cpu_seconds, 6),
+            'rows': self.rows,
+            'rows_per_second': round(self.rows / self.seconds) if self.rows and self.seconds else None,
+            'bytes_read': self.bytes_read,
+            'bytes_written': self.bytes_written,
+            'peak_rss_mb': round(self.peak_rss_mb, 1),
+        }
+
+
+class PipelineMetrics:
+    """Stage timers and counters for one run of a pipeline command"""
+
+    def __init__(self, command, metrics_path=None, prometheus_path=None, profile_dir=None):
+        self.command = command
+        self.run_id = uuid.uuid4().hex[:12]
+        self.metrics_path = metrics_path
+        self.prometheus_path = prometheus_path
+        self.profile_dir = profile_dir
+        self.stages = {}
+        # Entered stages, innermost last: [stage, child seconds, child CPU seconds, peak RSS]
+        self._active = []
+        # Peak RSS of the whole run (resetting the high-water mark also resets ru_maxrss)
+        self._peak_rss_mb = peak_rss_mb()
+        self._started = time.perf_counter()
+        self._started_cpu = time.process_time()
+
+    def add(self, name, rows=0, bytes_read=0, bytes_written=0):
+        """Add to a stage's counters without timing anything; return the Stage"""
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = Stage(name)
+        stage.rows += rows
+        stage.bytes_read += bytes_read
+        stage.bytes_written += bytes_written
+        return stage
+
+    @contextlib.contextmanager
+    def stage(self, name, rows=0, bytes_read=0, bytes_written=0):
+        """Time a block as (part of) a stage; counters may also be added to the yielded Stage"""
+        stage = self.add(name, rows, bytes_read, bytes_written)
+        stage.calls += 1
+
+        parent = self._active[-1] if self._active else None
+        self._switch_profiler(parent and parent[0], stage)
+        # The enclosing stages keep the peak reached so far before the mark is reset for this one
+        self._fold_peak_rss(peak_rss_mb())
+        reset_peak_rss()
+        frame = [stage, 0.0, 0.0, 0.0]
+        self._active.append(frame)
+        start, start_cpu = time.perf_counter(), time.process_time()
+        try:
+            yield stage
+        finally:
+            elapsed = time.perf_counter() - start
+            elapsed_cpu = time.process_time() - start_cpu
+            self._fold_peak_rss(peak_rss_mb())
+            self._active.pop()
+            stage.seconds += elapsed - frame[1]
+            stage.cpu_seconds += elapsed_cpu - frame[2]
+            stage.peak_rss_mb = max(stage.peak_rss_mb, frame[3])
+            if parent is not None:
+                parent[1] += elapsed
+                parent[2] += elapsed_cpu
+            self._switch_profiler(stage, parent and parent[0])
+
+    def _fold_peak_rss(self, peak):
+        for frame in self._active:
+            frame[3] = max(frame[3], peak)
+        self._peak_rss_mb = max(self._peak_rss_mb, peak)
+
+    def iterate(self, name, iterable):
+        """Yield from iterable, timing each step as the named stage and counting the rows of each item"""
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name) as stage:
+                item = next(iterator, None)
+                if item is None:
+                    stage.calls -= 1
+                    return
+                stage.rows += len(item)
+            yield item
+
+    def _switch_profiler(self, leaving, entering):
+        if self.profile_dir is None:
+            return
+        if leaving is not None:
+            leaving.profiler.disable()
+        if entering is not None:
+            if entering.profiler is None:
+                entering.profiler = cProfile.Profile()
+            entering.profiler.enable()
+
+    def records(self):
+        """One record per stage plus a 'total' record for the whole run"""
+        base = {'run': self.run_id, 'command': self.command, 'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')}
+        records = [{**base, **stage.record()} for stage in self.stages.values()]
+        records.append({
+            **base,
+            'stage': 'total',
+            'seconds': round(time.perf_counter() - self._started, 6),
+            'cpu_seconds': round(time.process_time() - self._started_cpu, 6),
+            'rows': max((stage.rows for stage in self.stages.values()), default=0),
+            'bytes_read': sum(stage.bytes_read for stage in self.stages.values()),
+            'bytes_written': sum(stage.bytes_written for stage in self.stages.values()),
+            'peak_rss_mb': round(max(self._peak_rss_mb, peak_rss_mb()), 1),
+        })
+        return records
+
+    def finish(self):
+        """Write the JSON lines, Prometheus text and profiles that were asked for; return the records"""
+        records = self.records()
+        if self.metrics_path:
+            with open(self.metrics_path, 'a') as f:
+                for record in records:
+                    f.write(json.dumps(record) + '\n')
+        if self.prometheus_path:
+            write_prometheus(records, self.prometheus_path)
+        if self.profile_dir:
+            self.dump_profiles()
+        return records
+
+    def dump_profiles(self):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        for stage in self.stages.values():
+            if stage.profiler is None:
+                continue
+            path = os.path.join(self.profile_dir, f'{self.command}-{stage.name}')
+            stage.profiler.dump_stats(path + '.prof')
+            summary = io.StringIO()
+            pstats.Stats(stage.profiler, stream=summary).sort_stats('cumulative').print_stats(PROFILE_LINES)
+            with open(path + '.txt', 'w') as f:
+                f.write(summary.getvalue())
+
+
+_PROMETHEUS_METRICS = [
+    ('seconds', 'email_pipeline_stage_seconds', 'Wall time spent in the stage'),
+    ('cpu_seconds', 'email_pipeline_stage_cpu_seconds', 'CPU time spent in the stage'),
+    ('rows', 'email_pipeline_stage_rows', 'Rows processed by the stage'),
+    ('bytes_read', 'email_pipeline_stage_bytes_read', 'Bytes read by the stage'),
+    ('bytes_written', 'email_pipeline_stage_bytes_written', 'Bytes written by the stage'),
+    ('peak_rss_mb', 'email_pipeline_stage_peak_rss_megabytes', 'Peak RSS while the stage ran'),
+]
+
+
+def write_prometheus(records, path):
+    """Write stage records in the Prometheus text exposition format, replacing the file atomically"""
+    lines = []
+    for key, metric, description in _PROMETHEUS_METRICS:
+        lines.append(f'# HELP {metric} {description}')
+        lines.append(f'# TYPE {metric} gauge')
+        for record in records:
+            if record.get(key) is not None:
+                lines.append(f'{metric}{{command="{record["command"]}",stage="{record["stage"]}"}} {record[key]}')
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+    os.replace(tmp_path, path)
+
+
+def add_metrics_arguments(parser):
+    """Add --metrics, --prometheus and --profile to a command's argument parser"""
+    parser.add_argument('--metrics', help='append per-stage timings and counters to this JSON-lines file')
+    parser.add_argument('--prometheus', help='also write the stage metrics as Prometheus text to this file')
+    parser.add_argument('--profile', metavar='DIR', help='run every stage under cProfile and dump the stats to DIR')
+
+
+def metrics_from_args(command, args):
+    return PipelineMetrics(command, args.metrics, args.prometheus, args.profile)
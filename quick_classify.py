@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Pure standard-library classifier for small CSV batches.
+
+For a handful of emails (the five-email steps in README.md) importing pandas
+and NumPy costs far more than classifying. This module reads the CSV with the
+csv module, compiles rules.toml into plain Python predicates and labels one
+record at a time, with the same semantics as the vectorized engine:
+
+  - cells pandas reads as missing ('', 'NA', 'None', ...) are missing, except
+    catalog values of categorical signals (signal_schema.na_values)
+  - numeric signals are compared as float32, as in the signal matrix, and a
+    missing numeric signal never matches
+  - a boolean signal is set only when it equals 1; missing reads as 0
+  - categorical values are matched by their catalog dictionary codes
+
+email_cli.py uses it for `classify` on CSV files up to SMALL_CSV_BYTES when
+the rules only test catalog signals; the output is identical to batch_classify.py.
+"""
+
+import argparse
+import csv
+import math
+import operator
+import os
+import re
+import struct
+
+from rule_syntax import CLASS_NAMES, RULES_PATH, load_policy, parse_condition, rule_terms
+from signal_schema import (BOOL, CATEGORICAL, DATA_ID, INT, MISSING_CODE, NA_VALUES, canonical_name,
+                           encode_category, load_schema, na_values, other_code)
+
+# Largest CSV file classified on this path
+SMALL_CSV_BYTES = 1 << 20
+
+DATA_ID_PATTERN = re.compile(r'^D\d+$')
+
+# Value of a signal that is not in the file at all (numeric signals: NaN)
+_ABSENT = {CATEGORICAL: MISSING_CODE, BOOL: 0.0}
+
+_COMPARE = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+
+
+def float32(value):
+    """Round a float to the nearest float32, as the signal matrix stores it"""
+    try:
+        return struct.unpack('f', struct.pack('f', value))[0]
+    except OverflowError:
+        return math.copysign(math.inf, value)
+
+
+def _number(text):
+    if text is None or text in NA_VALUES:
+        return math.nan
+    try:
+        return float(text)
+    except ValueError:
+        return math.nan
+
+
+def _condition(text, sets, where):
+    """Compile '<signal> <op> <value>' (rule_syntax.py) into (signal, predicate over the signal's value)"""
+    signal, op, value = parse_condition(text, sets, where)
+    values = value if isinstance(value, list) else [value]
+    negated = op in ('!=', 'not in')
+    if load_schema()[signal].dtype == CATEGORICAL:
+        # Values outside the signal's dictionary can never match
+        codes = {encode_category(signal, v) for v in values} - {other_code(signal)}
+        if negated:
+            return signal, lambda code: code not in codes
+        return signal, lambda code: code in codes
+
+    thresholds = [float32(v) for v in values]
+    if op in ('in', 'not in'):
+        return signal, lambda x: x == x and (x in thresholds) != negated
+    compare, threshold = _COMPARE[op], thresholds[0]
+    # x == x is False for NaN: a missing numeric signal never matches
+    return signal, lambda x: x == x and compare(x, threshold)
+
+
+def compile_policy(path=RULES_PATH):
+    """rules.toml as (default label, (label, rule) of the fast path, [(label, [(rule, terms)])]).
+
+    A term is a list of (signal, predicate) that must all hold.
+    """
+    policy = load_policy(path)
+    where = os.path.basename(path)
+    sets = policy.get('sets', {})
+
+    classes = []
+    fast_path = None
+    for spec in policy.get('class', []):
+        rules = []
+        for rule in spec.get('rule', []):
+            rule_where = f"{where}: {spec['name']}.{rule.get('name')}"
+            terms = [[_condition(part, sets, rule_where) for part in term] for term in rule_terms(rule, rule_where)]
+            rules.append((rule['name'], terms))
+            if rule.get('fast_path'):
+                fast_path = (spec['name'], rule['name'])
+        classes.append((spec['name'], rules))
+    return policy.get('default', 'No Action'), fast_path, classes
+
+
+def read_records(path):
+    """Signal records of a CSV file as {signal: value} dicts, typed like signal_loader.apply_schema"""
+    schema = load_schema()
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        rows = [row for row in reader if row]
+
+    columns = {}
+    for i, column in enumerate(header):
+        name = canonical_name(column)
+        if name is not None and name not in columns:
+            columns[name] = [row[i] if i < len(row) else '' for row in rows]
+
+    data_ids = [(value or '').strip() for value in columns.get(DATA_ID, [''] * len(rows))]
+    typed = {}
+    for name, spec in schema.items():
+        values = columns.get(name)
+        if values is None:
+            typed[name] = [_ABSENT.get(spec.dtype, math.nan)] * len(rows)
+        elif spec.dtype == CATEGORICAL:
+            missing = na_values(name)
+            typed[name] = [MISSING_CODE if value in missing else encode_category(name, value) for value in values]
+        else:
+            numbers = [_number(value) for value in values]
+            if spec.dtype == BOOL:
+                typed[name] = [1.0 if x == 1 else 0.0 for x in numbers]
+            elif spec.dtype == INT and not any(x != x for x in numbers):
+                # Integer columns without missing values are truncated to int32
+                typed[name] = [float32(float(int(x))) for x in numbers]
+            else:
+                typed[name] = [float32(x) for x in numbers]
+
+    records = []
+    for r, data_id in enumerate(data_ids):
+        if DATA_ID_PATTERN.match(data_id):
+            records.append((data_id, {name: values[r] for name, values in typed.items()}))
+    return records
+
+
+def classify_record(record, policy):
+    """(label, rule name or None) of one typed record"""
+    default, _, classes = policy
+    for label, rules in classes:
+        for rule, terms in rules:
+            for term in terms:
+                if all(predicate(record[signal]) for signal, predicate in term):
+                    return label, rule
+    return default, None
+
+
+def policy_supported(path=RULES_PATH):
+    """Whether this module can evaluate a rule file: every condition tests a catalog signal.
+
+    Rules on derived features (derived_features.py) need the NumPy engine.
+    """
+    try:
+        compile_policy(path)
+    except ValueError:
+        return False
+    return True
+
+
+def small_csv(path):
+    """Whether a source file can take the standard-library path"""
+    return str(path).lower().endswith('.csv') and os.path.isfile(path) and os.path.getsize(path) <= SMALL_CSV_BYTES
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Classify a small CSV signal file without pandas or NumPy')
+    parser.add_argument('source', help='signal file (CSV)')
+    parser.add_argument('-o', '--output', default='predicted_outcome.csv', help='outcome file to write')
+    args = parser.parse_args(argv)
+
+    policy = compile_policy()
+    counts = dict.fromkeys(CLASS_NAMES, 0)
+    fast = 0
+    records = read_records(args.source)
+    with open(args.output, 'w', newline='') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        for data_id, record in records:
+            label, rule = classify_record(record, policy)
+            writer.writerow([data_id, label])
+            counts[label] += 1
+            fast += (label, rule) == policy[1]
+
+    print(f"Classified {len(records)} emails from {args.source} -> {args.output}")
+    for label in CLASS_NAMES[::-1]:
+        print(f"  {label}: {counts[label]}")
+    if records:
+        print(f"Fast path: {fast}/{len(records)} emails ({fast / len(records) * 100:.1f}%) settled by hard indicators")
+
+
+if __name__ == "__main__":
+    main()
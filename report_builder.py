@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Vectorized report builder for signal tables.
+
+Per-email active-signal counts, category buckets and high-risk indicators are
+computed once as column-wise array operations (build_report) and every output
+format is rendered from that shared result: the detailed text report and the
+summary CSV that the create_dXX_report scripts used to produce with iterrows.
+"""
+
+import argparse
+import csv
+
+import numpy as np
+
+from data_id_index import parse_id_range
+from derived_features import DERIVED_FEATURES, derived_block
+from pipeline_metrics import add_metrics_arguments, file_size, metrics_from_args
+from scoring_engine import build_signal_matrix
+from signal_cache import open_cached_store
+from signal_loader import data_id_numbers, iter_signal_chunks, load_signal_table
+from signal_activation import activation_counts, activation_matrix, high_risk_matrix
+from signal_schema import DATA_ID, OTHER_CATEGORY
+
+CATEGORY_LABELS = {
+    'sender': 'Sender',
+    'auth': 'Authentication',
+    'attachment': 'Attachment',
+    'behavioral': 'Behavioral',
+    'url': 'URL',
+    'content': 'Content',
+    OTHER_CATEGORY: 'Other',
+}
+
+RISK_LEVELS = np.array(['VERY LOW', 'LOW', 'MEDIUM', 'HIGH', 'VERY HIGH'], dtype=object)
+# Upper bounds (inclusive) of active-signal counts for the first four risk levels
+RISK_LEVEL_BOUNDS = [0, 2, 5, 10]
+
+
+class Report:
+    """Per-email statistics for one signal table, shared by every renderer"""
+
+    def __init__(self, data_ids, signals, columns, active, high_risk, composites):
+        self.data_ids = data_ids
+        self.signals = signals
+        self.columns = columns
+        self.active = active
+        self.high_risk = high_risk
+        # (n, len(DERIVED_FEATURES)) composite signals (derived_features.py)
+        self.composites = composites
+        self.active_count, category_counts = activation_counts(signals, active)
+        self.high_risk_count = high_risk.sum(axis=1)
+        self.risk_level = RISK_LEVELS[np.searchsorted(RISK_LEVEL_BOUNDS, self.active_count)]
+        self.category_counts = {CATEGORY_LABELS[name]: counts for name, counts in category_counts.items()}
+
+    def __len__(self):
+        return len(self.data_ids)
+
+
+def build_report(df):
+    """Compute every per-email statistic for a signal table in one column-wise pass.
+
+    Active signals and high-risk indicators follow the canonical, polarity-aware
+    definitions in signal_activation.py; composites come from derived_features.py.
+    """
+    signals, active = activation_matrix(df)
+    columns = [df[name].to_numpy() for name in signals]
+    high_risk = high_risk_matrix(df, signals)
+    composites = derived_block(build_signal_matrix(df))
+    return Report(df[DATA_ID].to_numpy(dtype=object), signals, columns, active, high_risk, composites)
+
+
+class ReportTotals:
+    """Batch-level statistics accumulated across one or more reports (e.g. streamed chunks)"""
+
+    def __init__(self):
+        self.emails = 0
+        self.active_total = 0
+        self.most_active = (None, -1)
+        self.least_active = (None, None)
+        self.signal_active = {}
+        self.risk_counts = {level: 0 for level in RISK_LEVELS}
+
+    def update(self, report):
+        if not len(report):
+            return
+        self.emails += len(report)
+        self.active_total += int(report.active_count.sum())
+
+        top = int(np.argmax(report.active_count))
+        if report.active_count[top] > self.most_active[1]:
+            self.most_active = (report.data_ids[top], int(report.active_count[top]))
+        low = int(np.argmin(report.active_count))
+        if self.least_active[1] is None or report.active_count[low] < self.least_active[1]:
+            self.least_active = (report.data_ids[low], int(report.active_count[low]))
+
+        for name, count in zip(report.signals, report.active.sum(axis=0)):
+            self.signal_active[name] = self.signal_active.get(name, 0) + int(count)
+        levels, counts = np.unique(report.risk_level, return_counts=True)
+        for level, count in zip(levels, counts):
+            self.risk_counts[level] += int(count)
+
+
+def write_email_sections(f, report):
+    """Per-email sections of the detailed text report"""
+    total = len(report.signals)
+    rows, cols = np.nonzero(report.active)
+    starts = np.searchsorted(rows, np.arange(len(report) + 1))
+    risky_rows, risky_cols = np.nonzero(report.high_risk)
+    risky_starts = np.searchsorted(risky_rows, np.arange(len(report) + 1))
+
+    for r, data_id in enumerate(report.data_ids):
+        f.write("=" * 80 + "\n")
+        f.write(f"EMAIL: {data_id}\n")
+        f.write("=" * 80 + "\n\n")
+
+        f.write("SIGNAL DISTRIBUTION:\n")
+        f.write("-" * 30 + "\n")
+        for category, counts in report.category_counts.items():
+            f.write(f"  {category}: {counts[r]}\n")
+        f.write("\n")
+
+        f.write("ACTIVE SIGNALS:\n")
+        f.write("-" * 30 + "\n")
+        for c in cols[starts[r]:starts[r + 1]]:
+            f.write(f"  {report.signals[c]}: {report.columns[c][r]}\n")
+        f.write("\n")
+
+        f.write("RISK SUMMARY:\n")
+        f.write("-" * 30 + "\n")
+        f.write(f"Total active signals: {report.active_count[r]}/{total}\n")
+        f.write(f"Signal activity percentage: {report.active_count[r] / total * 100:.1f}%\n")
+        f.write(f"Risk level: {report.risk_level[r]}\n")
+
+        risky = risky_cols[risky_starts[r]:risky_starts[r + 1]]
+        if len(risky):
+            f.write("\nHIGH RISK INDICATORS:\n")
+            f.write("-" * 30 + "\n")
+            for c in risky:
+                f.write(f"  {report.signals[c]}: {report.columns[c][r]}\n")
+        else:
+            f.write("\nNo high-risk indicators detected.\n")
+        f.write("\n")
+
+
+def write_summary_section(f, totals):
+    """Batch summary at the end of the detailed text report"""
+    f.write("=" * 100 + "\n")
+    f.write("BATCH SUMMARY\n")
+    f.write("=" * 100 + "\n\n")
+    if not totals.emails:
+        f.write("No emails analyzed.\n")
+        return
+
+    f.write(f"Total emails analyzed: {totals.emails}\n")
+    f.write(f"Most active email: {totals.most_active[0]} with {totals.most_active[1]} signals\n")
+    f.write(f"Least active email: {totals.least_active[0]} with {totals.least_active[1]} signals\n")
+    f.write(f"Average signal activity: {totals.active_total / totals.emails:.1f} signals per email\n\n")
+
+    f.write("RISK DISTRIBUTION:\n")
+    f.write("-" * 40 + "\n")
+    for level, count in totals.risk_counts.items():
+        f.write(f"  {level}: {count} emails\n")
+    f.write("\n")
+
+    f.write("MOST COMMON ACTIVE SIGNALS:\n")
+    f.write("-" * 40 + "\n")
+    common = sorted(totals.signal_active.items(), key=lambda item: item[1], reverse=True)
+    for name, count in common[:20]:
+        if count:
+            f.write(f"{name}: active in {count}/{totals.emails} emails ({count / totals.emails * 100:.0f}%)\n")
+
+
+def write_summary_rows(writer, report):
+    """One summary CSV row per email"""
+    total = len(report.signals)
+    risky_rows, risky_cols = np.nonzero(report.high_risk)
+    risky_starts = np.searchsorted(risky_rows, np.arange(len(report) + 1))
+
+    for r, data_id in enumerate(report.data_ids):
+        details = [f"{report.signals[c]}:{report.columns[c][r]}"
+                   for c in risky_cols[risky_starts[r]:min(risky_starts[r] + 3, risky_starts[r + 1])]]
+        row = [data_id, report.active_count[r], f"{report.active_count[r] / total * 100:.1f}%",
+               report.risk_level[r], report.high_risk_count[r], '; '.join(details) or 'None']
+        row.extend(report.category_counts[name][r] for name in report.category_counts)
+        row.extend(f"{value:g}" for value in report.composites[r])
+        writer.writerow(row)
+
+
+def generate_reports(reports, text_path, csv_path):
+    """Render the text report and summary CSV from an iterable of Report objects"""
+    totals = ReportTotals()
+    with open(text_path, 'w') as text, open(csv_path, 'w', newline='') as summary:
+        text.write("=" * 100 + "\n")
+        text.write("DETAILED ANALYSIS REPORT\n")
+        text.write("=" * 100 + "\n\n")
+
+        writer = None
+        for report in reports:
+            if writer is None:
+                writer = csv.writer(summary, lineterminator='\n')
+                writer.writerow(['Email_ID', 'Total_Active_Signals', 'Signal_Activity_Percentage',
+                                 'Risk_Level', 'High_Risk_Signals', 'High_Risk_Details'] +
+                                [f'{name}_Signals' for name in report.category_counts] + list(DERIVED_FEATURES))
+            write_email_sections(text, report)
+            write_summary_rows(writer, report)
+            totals.update(report)
+
+        write_summary_section(text, totals)
+    return totals
+
+
+def select_range(df, id_range):
+    """Rows whose Data ID number falls in an inclusive range like 'D86-D90'"""
+    first, last = parse_id_range(id_range)
+    numbers = data_id_numbers(df[DATA_ID])
+    return df[(numbers >= first) & (numbers <= last)].reset_index(drop=True)
+
+
+def stream_range(tables, id_range):
+    """Rows of streamed tables in a Data ID range.
+
+    Stops reading once the Data IDs, ascending so far, are past the end of the
+    range; a file out of Data ID order is read to the end.
+    """
+    last = parse_id_range(id_range)[1]
+    previous = -1
+    for df in tables:
+        numbers = data_id_numbers(df[DATA_ID])
+        ascending = previous is not None and previous <= numbers[0] and bool((np.diff(numbers) >= 0).all())
+        previous = int(numbers[-1]) if ascending else None
+        selected = select_range(df, id_range)
+        if len(selected):
+            yield selected
+        if ascending and previous > last:
+            return
+
+
+def _load_tables(args):
+    if args.chunk_size:
+        tables = iter_signal_chunks(args.source, args.chunk_size)
+        yield from stream_range(tables, args.range) if args.range else tables
+    elif args.range:
+        # Only the rows in the range are read, located through the Data ID index
+        store = open_cached_store(args.source)
+        yield store.frame(store.index.select(args.range))
+    else:
+        yield load_signal_table(args.source)
+
+
+def _timed_reports(tables, metrics):
+    # Rendering pulls the reports one table at a time, so loading and building are timed as their own stages
+    for df in metrics.iterate('load', tables):
+        with metrics.stage('build', rows=len(df)):
+            report = build_report(df)
+        yield report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build the detailed and summary reports for a signal file')
+    parser.add_argument('source', nargs='?', default='001.xlsx', help='signal file (CSV or XLSX)')
+    parser.add_argument('--range', help="only report Data IDs in this range, e.g. 'D86-D90'")
+    parser.add_argument('--prefix', help="output file prefix (default: 'generated_D86_D90' for a range, else 'signal')")
+    parser.add_argument('--chunk-size', type=int, help='stream the source in chunks of this many rows')
+    add_metrics_arguments(parser)
+    args = parser.parse_args(argv)
+
+    # Range reports get their own prefix so the committed DXX_DYY reports are never overwritten
+    prefix = args.prefix or ('generated_' + args.range.upper().replace('-', '_') if args.range else 'signal')
+    text_path, csv_path = f'{prefix}_analysis_report.txt', f'{prefix}_summary_analysis.csv'
+    metrics = metrics_from_args('report_builder', args)
+    metrics.add('load', bytes_read=file_size(args.source))
+    with metrics.stage('render') as stage:
+        totals = generate_reports(_timed_reports(_load_tables(args), metrics), text_path, csv_path)
+        stage.rows += totals.emails
+    metrics.add('render', bytes_written=file_size(text_path) + file_size(csv_path))
+    metrics.finish()
+    print(f"Reported {totals.emails} emails -> {text_path}, {csv_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+Declarative classification rules (rules.toml) compiled into a flat decision table.
+
+At load time every condition in the rule file ("content_spam_score >= 0.6",
+"spf_result in auth_failures", ...) is parsed once by rule_syntax.py (shared
+with the standard-library path in quick_classify.py), resolved to a catalog
+signal or a derived feature (derived_features.py) and deduplicated into one
+condition list. Each rule becomes a list of terms, and each term is a tuple
+of condition indices that must all hold.
+
+Evaluation walks the classes in priority order and only looks at rows that no
+earlier rule has labelled. Decisive rules such as the known-malicious
+indicators run first over every row, and each later rule only runs over the
+rows still undecided. A condition shared by several rules is evaluated once
+per set of undecided rows.
+
+Terms that are a single "<boolean signal> == 1" test are folded together, so
+a rule like "any known-malicious indicator set" is one AND of the bit-packed
+boolean signals against a word mask.
+
+The first rule can be marked fast_path = true when it only tests boolean
+indicators. scoring_engine then settles those rows from a bitmask over the
+indicator columns alone, before the full signal matrix is built.
+"""
+
+import functools
+import hashlib
+import os
+
+import numpy as np
+
+from bitpack import BOOL_SIGNALS
+from derived_features import DERIVED_FEATURES
+from rule_syntax import RULES_PATH, class_code, load_policy, parse_condition as parse_syntax, rule_terms
+from scoring_engine import CATEGORICAL_SIGNALS
+from signal_schema import CATALOG_PATH, encode_category, other_code
+
+# Bumped whenever a change to the engine changes the verdict of some email under the same rule file
+ENGINE_VERSION = 1
+
+_COMPARE = {
+    '==': np.equal,
+    '!=': np.not_equal,
+    '<': np.less,
+    '<=': np.less_equal,
+    '>': np.greater,
+    '>=': np.greater_equal,
+}
+
+
+class Condition:
+    """One compiled '<signal> <op> <value>' test"""
+
+    def __init__(self, signal, op, value):
+        self.signal = signal
+        self.op = op
+        self.value = value
+        self.categorical = signal in CATEGORICAL_SIGNALS
+        # "<boolean signal> == 1" is answered from the packed bits
+        self.bit_test = signal in BOOL_SIGNALS and op == '==' and value == 1
+        self.lookup = self._category_lookup() if self.categorical else None
+
+    def _category_lookup(self):
+        """Boolean table indexed by category code: does a value with that code pass the test"""
+        values = self.value if isinstance(self.value, list) else [self.value]
+        codes = [encode_category(self.signal, value) for value in values]
+        lookup = np.zeros(other_code(self.signal) + 1, dtype=bool)
+        # Values outside the signal's dictionary can never match
+        lookup[[code for code in codes if code != other_code(self.signal)]] = True
+        return ~lookup if self.op in ('!=', 'not in') else lookup
+
+    def key(self):
+        value = tuple(self.value) if isinstance(self.value, list) else self.value
+        return self.signal, self.op, value
+
+    def evaluate(self, m, rows=None):
+        """Boolean mask over the given rows (all rows when rows is None)"""
+        if self.bit_test and m.booleans is not None:
+            return m.booleans.any(m.booleans.mask([self.signal]), rows)
+        if self.categorical:
+            codes = m.code(self.signal)
+            return self.lookup[codes if rows is None else codes[rows]]
+
+        column = m.num(self.signal)
+        if rows is not None:
+            column = column[rows]
+
+        if self.op in ('in', 'not in'):
+            mask = np.isin(column, self.value)
+            if self.op == 'not in':
+                mask = ~mask
+        else:
+            mask = _COMPARE[self.op](column, self.value)
+        if self.op in ('!=', 'not in'):
+            # Missing numeric signals never match
+            mask &= ~np.isnan(column)
+        return mask
+
+
+def parse_condition(text, sets, where=''):
+    """Compile one rule_syntax condition, which may also test a derived feature"""
+    return Condition(*parse_syntax(text, sets, where, DERIVED_FEATURES))
+
+
+class Rule:
+    """One compiled rule: condition-index terms, with single boolean "== 1" terms folded into bit_terms"""
+
+    def __init__(self, name, terms, conditions):
+        self.name = name
+        self.bit_terms = [term[0] for term in terms if len(term) == 1 and conditions[term[0]].bit_test]
+        self.bit_signals = [conditions[index].signal for index in self.bit_terms]
+        self.terms = [term for term in terms if not (len(term) == 1 and conditions[term[0]].bit_test)]
+
+
+class FastPath:
+    """Tier-one rule: any of a few boolean indicators settles the label without the full evaluation"""
+
+    def __init__(self, code, hit_key, signals):
+        self.code = code
+        self.hit_key = hit_key
+        self.signals = signals
+
+
+class DecisionTable:
+    """Compiled rule set: deduplicated conditions plus per-class rules of condition-index terms"""
+
+    def __init__(self, conditions, classes, default, fast_path=None):
+        self.conditions = conditions
+        self.classes = classes
+        self.default = default
+        self.fast_path = fast_path
+
+    @property
+    def signals(self):
+        return sorted({condition.signal for condition in self.conditions})
+
+    def evaluate(self, m, skip_fast_path=False):
+        """Label every row of a SignalMatrix; return (label codes, {'class.rule': mask})
+
+        A hit mask marks the rows that rule labelled. Rows decided by an earlier
+        rule are not evaluated again, so each row has at most one hit. Pass
+        skip_fast_path=True for rows already known to miss the fast-path rule.
+        """
+        n = len(m)
+        labels = np.full(n, self.default, dtype=np.int8)
+        hits = {}
+        rows = None
+        cache = {}
+
+        skip = self.fast_path.hit_key if skip_fast_path and self.fast_path else None
+
+        for code, prefix, rules in self.classes:
+            for rule in rules:
+                key = f'{prefix}.{rule.name}'
+                hit = np.zeros(n, dtype=bool)
+                hits[key] = hit
+                remaining = n if rows is None else len(rows)
+                if not remaining or key == skip:
+                    continue
+
+                terms = rule.terms
+                if rule.bit_terms and m.booleans is not None:
+                    # Every single-bit term of the rule in one AND against the packed words
+                    fired = m.booleans.any(m.booleans.mask(rule.bit_signals), rows)
+                else:
+                    fired = np.zeros(remaining, dtype=bool)
+                    terms = terms + [(index,) for index in rule.bit_terms]
+                for term in terms:
+                    mask = None
+                    for index in term:
+                        if index not in cache:
+                            cache[index] = self.conditions[index].evaluate(m, rows)
+                        mask = cache[index] if mask is None else mask & cache[index]
+                    fired |= mask
+                if not fired.any():
+                    continue
+
+                decided = np.flatnonzero(fired) if rows is None else rows[fired]
+                labels[decided] = code
+                hit[decided] = True
+                keep = ~fired
+                rows = np.flatnonzero(keep) if rows is None else rows[keep]
+                cache = {index: mask[keep] for index, mask in cache.items()}
+
+        return labels, hits
+
+
+def _fast_path(classes, policy, where):
+    """FastPath for the rule marked fast_path = true, which must be the first rule evaluated"""
+    marked = [(c, r) for c, spec in enumerate(policy.get('class', []))
+              for r, rule in enumerate(spec.get('rule', [])) if rule.get('fast_path')]
+    if not marked:
+        return None
+    if marked != [(0, 0)]:
+        raise ValueError(f"{where}: only the first rule of the first class can be the fast path")
+
+    code, prefix, rules = classes[0]
+    rule = rules[0]
+    if rule.terms or not rule.bit_terms:
+        raise ValueError(f"{where}: fast-path rule {rule.name} may only test boolean signals with '== 1'")
+    return FastPath(code, f'{prefix}.{rule.name}', rule.bit_signals)
+
+
+def compile_rules(policy, where='rules'):
+    """Compile a parsed rule policy (the rules.toml structure) into a DecisionTable"""
+    sets = policy.get('sets', {})
+    conditions = []
+    positions = {}
+
+    def condition_index(text, rule_where):
+        condition = parse_condition(text, sets, rule_where)
+        key = condition.key()
+        if key not in positions:
+            positions[key] = len(conditions)
+            conditions.append(condition)
+        return positions[key]
+
+    classes = []
+    for spec in policy.get('class', []):
+        class_name = spec.get('name')
+        code = class_code(class_name, where)
+        rules = []
+        for rule in spec.get('rule', []):
+            rule_where = f"{where}: {class_name}.{rule.get('name')}"
+            terms = [tuple(condition_index(part, rule_where) for part in term)
+                     for term in rule_terms(rule, rule_where)]
+            rules.append(Rule(rule['name'], terms, conditions))
+        classes.append((code, class_name.lower().replace(' ', '_'), rules))
+
+    default = class_code(policy.get('default', 'No Action'), where)
+    return DecisionTable(conditions, classes, default, _fast_path(classes, policy, where))
+
+
+@functools.lru_cache(maxsize=None)
+def load_rules(path=RULES_PATH):
+    """Compiled DecisionTable for a rule file, parsed once per path"""
+    return compile_rules(load_policy(path), os.path.basename(path))
+
+
+@functools.lru_cache(maxsize=None)
+def policy_digest(path=RULES_PATH):
+    """Digest of everything besides the signals that a verdict depends on.
+
+    That is the rule file, the signal catalog (its value dictionaries decide
+    categorical matches) and ENGINE_VERSION. Stored verdicts computed under
+    another digest are stale.
+    """
+    digest = hashlib.blake2b(f'engine {ENGINE_VERSION}\n'.encode(), digest_size=16)
+    for name in (path, CATALOG_PATH):
+        with open(name, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
@@ -0,0 +1,114 @@
+"""
+Syntax of the rule file (rules.toml), shared by both evaluators.
+
+rule_engine.py compiles the rules into NumPy array expressions and
+quick_classify.py into plain Python predicates. Both read the file and parse
+its conditions here, so a rule means the same thing (and is rejected for the
+same reasons) on either path. Only the standard library and signal_schema are
+imported, so the quick path stays free of pandas and NumPy.
+
+A condition is '<signal> <op> <value>':
+  - op is one of == != < <= > >= in, not in
+  - value is a number, a quoted string, or (for in / not in) the name of a
+    list under [sets]
+  - categorical signals only take ==, !=, in and not in, against strings
+A rule lists its conditions as 'all' (every one must hold) or 'any' (at least
+one term must hold, a term being conditions joined by 'and').
+"""
+
+import os
+import re
+from collections import namedtuple
+
+from signal_schema import CATEGORICAL, canonical_name, encode_category, load_schema, other_code
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    import tomli as tomllib
+
+RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rules.toml')
+
+# Label names by label code, lowest priority first
+CLASS_NAMES = ('No Action', 'Warning', 'Spam', 'Malicious')
+
+CONDITION_PATTERN = re.compile(r'^\s*(\w+)\s*(==|!=|<=|>=|<|>|not\s+in|in)\s*(.+?)\s*$')
+
+# A parsed condition; value is a float or string, or a list of them for in / not in
+ParsedCondition = namedtuple('ParsedCondition', ['signal', 'op', 'value'])
+
+
+def load_policy(path=RULES_PATH):
+    """The rule file as parsed TOML"""
+    with open(path, 'rb') as f:
+        return tomllib.load(f)
+
+
+def class_code(name, where):
+    """Label code of a class name"""
+    if name not in CLASS_NAMES:
+        raise ValueError(f"{where}: unknown class {name!r} (expected one of {', '.join(CLASS_NAMES)})")
+    return CLASS_NAMES.index(name)
+
+
+def _parse_value(text, sets, signal, categorical, where):
+    if text[0] in '"\'' and text[-1] == text[0]:
+        value = text[1:-1]
+    elif text in sets:
+        value = list(sets[text])
+    else:
+        try:
+            value = float(text)
+        except ValueError:
+            raise ValueError(f"{where}: unknown value or set {text!r}") from None
+
+    values = value if isinstance(value, list) else [value]
+    if categorical and not all(isinstance(v, str) for v in values):
+        raise ValueError(f"{where}: categorical signal compared with a number")
+    if categorical:
+        # A set may be shared by signals with different dictionaries (softfail is an SPF-only result),
+        # so only a set with no value at all for this signal is an error
+        known = [v for v in values if encode_category(signal, v) != other_code(signal)]
+        if not known:
+            raise ValueError(f"{where}: {text!r} has no catalog value of {signal}")
+    else:
+        try:
+            value = [float(v) for v in values] if isinstance(value, list) else float(value)
+        except ValueError:
+            raise ValueError(f"{where}: numeric signal compared with a string") from None
+    return value
+
+
+def parse_condition(text, sets, where='', extra_signals=()):
+    """Parse '<signal> <op> <value>' into a ParsedCondition.
+
+    The signal may be any catalog name or alias, or one of extra_signals
+    (numeric signals outside the catalog, such as derived features).
+    """
+    match = CONDITION_PATTERN.match(text)
+    if match is None:
+        raise ValueError(f"{where}: cannot parse condition {text!r}")
+    header, op, value = match.groups()
+    op = ' '.join(op.split())
+
+    signal = canonical_name(header)
+    if signal is None and header in extra_signals:
+        signal = header
+    if signal is None:
+        raise ValueError(f"{where}: unknown signal {header!r}")
+    spec = load_schema().get(signal)
+    categorical = spec is not None and spec.dtype == CATEGORICAL
+    if categorical and op not in ('==', '!=', 'in', 'not in'):
+        raise ValueError(f"{where}: {op} is not defined for categorical signal {signal}")
+    if op in ('in', 'not in') and value not in sets:
+        raise ValueError(f"{where}: {op} needs a set name, got {value!r}")
+    return ParsedCondition(signal, op, _parse_value(value, sets, signal, categorical, where))
+
+
+def rule_terms(rule, where):
+    """A rule's terms as lists of condition strings that must all hold"""
+    if 'any' in rule:
+        return [re.split(r'\s+and\s+', term) for term in rule['any']]
+    if 'all' in rule:
+        return [list(rule['all'])]
+    raise ValueError(f"{where}: a rule needs 'any' or 'all'")
@@ -0,0 +1,281 @@
+"""
+Vectorized risk-scoring engine over the 68 detection signals.
+
+The signal table is converted once into a typed NumPy matrix (numeric signals)
+plus int8 codes against the catalog's value dictionaries (categorical
+signals), with the boolean signals bit-packed (bitpack.py). The classification rules live in
+rules.toml and are compiled by rule_engine.py into a decision table that is
+evaluated as boolean array expressions over all rows at once. score_table
+returns one label array and a hit mask per rule.
+"""
+
+import functools
+
+import numpy as np
+import pandas as pd
+
+from bitpack import BOOL_SIGNALS, pack_columns, pack_frame
+from derived_features import DERIVED_FEATURES, derive
+from rule_syntax import CLASS_NAMES as CLASS_ORDER
+from signal_schema import (CATEGORICAL, DATA_ID, MISSING_CODE, canonical_name, encode_category, load_schema,
+                           na_values, signals_of_type)
+
+# Label codes
+NO_ACTION, WARNING, SPAM, MALICIOUS = 0, 1, 2, 3
+CLASS_NAMES = np.array(CLASS_ORDER, dtype=object)
+
+# Hit key marking the rows settled by the tier-one fast path
+FAST_PATH_HIT = 'fast_path'
+
+CATEGORICAL_SIGNALS = signals_of_type(CATEGORICAL)
+
+
+class SignalMatrix:
+    """Signals of n emails: numeric columns, boolean signals as a BooleanPack, categorical signals as int8 codes.
+
+    Every column is a separate 1-D array, so a matrix can be assembled from
+    views onto a larger block, shared memory or a memory-mapped signal store
+    without copying.
+    """
+
+    def __init__(self, numeric, categorical, booleans):
+        self.numeric = numeric
+        self.categorical = categorical
+        self.booleans = booleans
+
+    def __len__(self):
+        return len(self.booleans)
+
+    def num(self, name):
+        """Numeric column; missing columns read as NaN (never match a rule).
+
+        Derived features (derived_features.py) are computed on first use and kept.
+        """
+        values = self.numeric.get(name)
+        if values is not None:
+            return values
+        if name in DERIVED_FEATURES:
+            values = self.numeric[name] = derive(name, self)
+            return values
+        if name in self.booleans.positions:
+            return self.booleans.column(name).astype(np.float32)
+        return np.full(len(self), np.nan, dtype=np.float32)
+
+    def flag(self, name):
+        if name in self.booleans.positions:
+            return self.booleans.any(self.booleans.mask([name]))
+        return self.num(name) == 1
+
+    def take(self, rows):
+        """The given rows (an index array) as a new SignalMatrix"""
+        return SignalMatrix({name: values[rows] for name, values in self.numeric.items()},
+                            {name: codes[rows] for name, codes in self.categorical.items()},
+                            self.booleans.take(rows))
+
+    def code(self, name):
+        """Categorical column as int8 codes (signal_schema.encode_category); missing columns read as missing"""
+        codes = self.categorical.get(name)
+        if codes is None:
+            return np.full(len(self), MISSING_CODE, dtype=np.int8)
+        return codes
+
+
+def build_numeric_block(df):
+    """Numeric (non-boolean) signals of a table as (float32 matrix, {column: index}); each column is contiguous"""
+    signal_columns = [col for col in df.columns if col != DATA_ID]
+    numeric = [col for col in signal_columns if col not in CATEGORICAL_SIGNALS and col not in BOOL_SIGNALS]
+
+    # Columns typed by the signal schema convert without per-cell coercion
+    values = np.empty((len(df), len(numeric)), dtype=np.float32, order='F')
+    for i, col in enumerate(numeric):
+        column = df[col]
+        if not pd.api.types.is_numeric_dtype(column):
+            column = pd.to_numeric(column, errors='coerce')
+        values[:, i] = column.to_numpy(dtype=np.float32, na_value=np.nan)
+    return values, {col: i for i, col in enumerate(numeric)}
+
+
+def numeric_columns(values, columns):
+    """{signal: column view} onto a build_numeric_block matrix"""
+    return {name: values[:, i] for name, i in columns.items()}
+
+
+def encode_column(name, column):
+    """int8 category codes for a column; each distinct value is looked up once, not per cell"""
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        labels, codes = column.cat.categories, column.cat.codes.to_numpy()
+    else:
+        codes, labels = pd.factorize(column)
+    # Code -1 (missing) picks the trailing MISSING_CODE entry
+    lookup = np.array([encode_category(name, label) for label in labels] + [MISSING_CODE], dtype=np.int8)
+    return lookup[codes]
+
+
+def build_category_block(df):
+    """Categorical signals of a table as an (n, len(CATEGORICAL_SIGNALS)) int8 code matrix"""
+    codes = np.full((len(df), len(CATEGORICAL_SIGNALS)), MISSING_CODE, dtype=np.int8, order='F')
+    for i, name in enumerate(CATEGORICAL_SIGNALS):
+        if name in df.columns:
+            codes[:, i] = encode_column(name, df[name])
+    return codes
+
+
+def category_columns(codes):
+    """{categorical signal: code column} views onto a build_category_block matrix"""
+    return {name: codes[:, i] for i, name in enumerate(CATEGORICAL_SIGNALS)}
+
+
+def build_signal_matrix(df):
+    """Convert a signal table into a SignalMatrix once, coercing each column in bulk"""
+    numeric = numeric_columns(*build_numeric_block(df))
+    categorical = category_columns(build_category_block(df))
+    return SignalMatrix(numeric, categorical, pack_frame(df))
+
+
+def _record_number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+@functools.lru_cache(maxsize=1024)
+def _header_signal(header):
+    # Record headers repeat across requests, so resolve each one only once
+    return canonical_name(header)
+
+
+class RecordError(ValueError):
+    """Signal records with fields that are not signals, or without signals the rules read"""
+
+    def __init__(self, unknown=(), missing=()):
+        self.unknown = sorted(unknown)
+        self.missing = sorted(missing)
+        problems = []
+        if self.unknown:
+            problems.append('unknown fields: ' + ', '.join(self.unknown))
+        if self.missing:
+            problems.append('missing signals: ' + ', '.join(self.missing))
+        super().__init__('; '.join(problems))
+
+
+def required_signals(rules_path=None):
+    """Signals a record must carry (possibly as null) for the rules to be evaluated on it"""
+    return _decision_table(rules_path).signals
+
+
+def check_records(records, rules_path=None):
+    """Raise RecordError naming the unknown fields and absent rule signals of signal records.
+
+    A field is unknown unless it is the Data ID, a catalog signal or an alias of one.
+    A signal sent as null is missing data and evaluates like a blank cell, but a
+    signal left out entirely is an error: without it the rules would fail open.
+    """
+    required = required_signals(rules_path)
+    unknown, missing = set(), set()
+    # Records of one request usually share their fields
+    for fields in {tuple(record) for record in records}:
+        names = {_header_signal(field) for field in fields}
+        unknown.update(field for field in fields if _header_signal(field) is None)
+        missing.update(name for name in required if name not in names)
+    if unknown or missing:
+        raise RecordError(unknown, missing)
+
+
+def build_record_matrix(records):
+    """Build a SignalMatrix straight from signal records (dicts keyed by column header), without pandas.
+
+    Headers may be catalog names or any known alias. Numeric signals that are
+    missing or not numbers read as NaN and missing categorical signals (or
+    strings pandas would read as missing, see na_values) get the missing code,
+    matching build_signal_matrix. Fields that are not signals are skipped, so
+    callers taking records from outside validate them with check_records first.
+    Returns (matrix, Data IDs or None per record).
+    """
+    names = [name for name in load_schema() if name not in CATEGORICAL_SIGNALS and name not in BOOL_SIGNALS]
+    numeric = {name: np.full(len(records), np.nan, dtype=np.float32) for name in names}
+    booleans = {name: np.zeros(len(records), dtype=np.float32) for name in BOOL_SIGNALS}
+    codes = np.full((len(records), len(CATEGORICAL_SIGNALS)), MISSING_CODE, dtype=np.int8)
+    categorical = category_columns(codes)
+    data_ids = []
+    for r, record in enumerate(records):
+        data_id = None
+        for key, value in record.items():
+            name = _header_signal(key)
+            if name is None:
+                continue
+            if name == DATA_ID:
+                data_id = None if value is None else str(value).strip()
+            elif name in categorical:
+                missing = isinstance(value, str) and value in na_values(name)
+                categorical[name][r] = MISSING_CODE if missing else encode_category(name, value)
+            elif name in booleans:
+                booleans[name][r] = _record_number(value)
+            else:
+                numeric[name][r] = _record_number(value)
+        data_ids.append(data_id)
+
+    return SignalMatrix(numeric, categorical, pack_columns(booleans, len(records))), data_ids
+
+
+def _decision_table(rules_path=None):
+    # Imported here because rule_engine builds on this module's constants
+    from rule_engine import RULES_PATH, load_rules
+    return load_rules(rules_path or RULES_PATH)
+
+
+def score_matrix(m, rules_path=None):
+    """Evaluate the rule policy (rules.toml) over a SignalMatrix; return (label codes, {rule: hit mask}).
+
+    hits[FAST_PATH_HIT] marks the rows labelled by the fast-path rule.
+    """
+    table = _decision_table(rules_path)
+    labels, hits = table.evaluate(m)
+    hits[FAST_PATH_HIT] = hits[table.fast_path.hit_key] if table.fast_path else np.zeros(len(m), dtype=bool)
+    return labels, hits
+
+
+def settle_fast_path(df, rules_path=None):
+    """Tier one: (mask of rows settled by the fast-path rule, their label code).
+
+    Only the fast-path indicator columns are read. The mask is all False when the
+    rule file has no fast path.
+    """
+    fast_path = _decision_table(rules_path).fast_path
+    if fast_path is None:
+        return np.zeros(len(df), dtype=bool), NO_ACTION
+    pack = pack_frame(df, fast_path.signals)
+    return pack.any(pack.mask(fast_path.signals)), fast_path.code
+
+
+def score_table(df, rules_path=None):
+    """Two-tier scoring of a signal table; return (label codes, {rule: hit mask}).
+
+    Rows with a hard indicator are settled from a bit-packed mask over those columns;
+    only the remaining rows are converted to a SignalMatrix and evaluated in
+    full. hits[FAST_PATH_HIT] marks the rows settled in tier one.
+    """
+    table = _decision_table(rules_path)
+    settled, code = settle_fast_path(df, rules_path)
+    if not settled.any():
+        labels, hits = table.evaluate(build_signal_matrix(df))
+        hits[FAST_PATH_HIT] = settled
+        return labels, hits
+
+    rest = np.flatnonzero(~settled)
+    rest_labels, rest_hits = table.evaluate(build_signal_matrix(df.iloc[rest]), skip_fast_path=True)
+
+    labels = np.full(len(df), code, dtype=np.int8)
+    labels[rest] = rest_labels
+    hits = {}
+    for key, mask in rest_hits.items():
+        hits[key] = np.zeros(len(df), dtype=bool)
+        hits[key][rest] = mask
+    hits[table.fast_path.hit_key] = settled
+    hits[FAST_PATH_HIT] = settled
+    return labels, hits
+
+
+def label_names(labels):
+    """Map label codes to Malicious/Spam/Warning/No Action strings"""
+    return CLASS_NAMES[labels]
@@ -0,0 +1,136 @@
+"""
+Canonical, polarity-aware definition of an active ("triggered") signal.
+
+A signal is active when its value points toward risk, read in the direction
+the catalog gives it (signal_schema polarity):
+  - flags: set for higher-is-bad flags (packer_detected == 1), cleared for
+    higher-is-good ones (dmarc_enforced == 0, reverse_dns_valid == 0)
+  - counts: above zero (malicious_attachment_count, total_ioc_count, ...)
+  - scores: at or above the score threshold (0.5) for higher-is-bad scores,
+    below it for higher-is-good ones, so a low sender_domain_reputation_score
+    is a trigger and a high one is not. Scores on other scales have their own
+    threshold (ACTIVATION_THRESHOLDS)
+  - categorical signals: a value the classification policy tests for
+    (spf_result in auth_failures, tls_version in outdated_tls, an
+    ssl_validity_status not in ssl_ok, ...), read from the compiled rules.toml
+    so the reports and the verdicts agree on which values are risky
+Missing values and columns that are not catalog signals are never active.
+
+A high-risk indicator is an active signal that is positive evidence of risk,
+again read from the polarity: a higher-is-bad flag that is set, a higher-is-bad
+count above zero, or a score at or beyond HIGH_RISK_SCORE (0.8) in its risky
+direction (scores on other scales: when active). A cleared higher-is-good flag
+(a missing protection such as dmarc_enforced == 0) and categorical values are
+active but not high-risk.
+
+activation_matrix and high_risk_matrix evaluate these over a whole table as
+column-wise array operations for the reports. Verdicts do not use them: each
+rule in rules.toml states its own thresholds (content_spam_score >= 0.6, ...),
+and those are the classification policy.
+"""
+
+import functools
+
+import numpy as np
+import pandas as pd
+
+from rule_engine import load_rules
+from scoring_engine import encode_column
+from signal_schema import (BOOL, CATEGORICAL, DATA_ID, FLOAT, HIGHER_IS_GOOD, MISSING_CODE, category_index,
+                           load_schema, other_code)
+
+# Scores are confidences in [0, 1]; this is where they start to count
+SCORE_THRESHOLD = 0.5
+
+# Scores that are not on the [0, 1] scale
+ACTIVATION_THRESHOLDS = {
+    # Shannon entropy in bits per character; packed or encrypted strings sit above ~6
+    'max_suspicious_string_entropy_score': 6.0,
+    # Seconds; long delays are typical of sandbox evasion
+    'max_sandbox_execution_time': 30.0,
+}
+
+# Scores are high-risk indicators from here on, in their risky direction
+HIGH_RISK_SCORE = 0.8
+
+def activation_threshold(name):
+    """Score threshold of a float signal"""
+    return ACTIVATION_THRESHOLDS.get(name, SCORE_THRESHOLD)
+
+
+@functools.lru_cache(maxsize=None)
+def _trigger_lookup(name):
+    # Boolean table indexed by category code: the codes any rule condition on the signal selects
+    lookup = np.zeros(other_code(name) + 1, dtype=bool)
+    for condition in load_rules().conditions:
+        if condition.categorical and condition.signal == name:
+            lookup |= condition.lookup
+    lookup[MISSING_CODE] = False
+    return lookup
+
+
+def _values(column):
+    if not pd.api.types.is_numeric_dtype(column):
+        column = pd.to_numeric(column, errors='coerce')
+    return column.to_numpy(dtype=np.float32, na_value=np.nan)
+
+
+def signal_activation(name, column):
+    """Boolean array: rows where a column (a pandas Series) of the named signal is active"""
+    spec = load_schema().get(name)
+    if spec is None:
+        return np.zeros(len(column), dtype=bool)
+    if spec.dtype == CATEGORICAL:
+        return _trigger_lookup(name)[encode_column(name, column)]
+
+    values = _values(column)
+    good = spec.polarity == HIGHER_IS_GOOD
+    if spec.dtype == FLOAT:
+        threshold = activation_threshold(name)
+        return values < threshold if good else values >= threshold
+    if spec.dtype == BOOL:
+        return values == 0 if good else values == 1
+    return values == 0 if good else values > 0
+
+
+def activation_matrix(df, signals=None):
+    """(signals, n x len(signals) boolean matrix of active signals) for a signal table.
+
+    signals defaults to every column but the Data ID, in table order.
+    """
+    if signals is None:
+        signals = [col for col in df.columns if col != DATA_ID]
+    active = np.zeros((len(df), len(signals)), dtype=bool)
+    for i, name in enumerate(signals):
+        active[:, i] = signal_activation(name, df[name])
+    return signals, active
+
+
+def signal_high_risk(name, column):
+    """Boolean array: rows where a column (a pandas Series) of the named signal is a high-risk indicator"""
+    spec = load_schema().get(name)
+    if spec is None or spec.dtype == CATEGORICAL:
+        return np.zeros(len(column), dtype=bool)
+    values = _values(column)
+    good = spec.polarity == HIGHER_IS_GOOD
+    if spec.dtype == FLOAT:
+        if name in ACTIVATION_THRESHOLDS:
+            return signal_activation(name, column)
+        return 1 - values >= HIGH_RISK_SCORE if good else values >= HIGH_RISK_SCORE
+    if good:
+        return np.zeros(len(column), dtype=bool)
+    return values == 1 if spec.dtype == BOOL else values > 0
+
+
+def high_risk_matrix(df, signals):
+    """n x len(signals) boolean matrix of high-risk indicators for a signal table"""
+    high_risk = np.zeros((len(df), len(signals)), dtype=bool)
+    for i, name in enumerate(signals):
+        high_risk[:, i] = signal_high_risk(name, df[name])
+    return high_risk
+
+
+def activation_counts(signals, active):
+    """Per-email active-signal counts: (total, {category: counts}) using signal_schema categories"""
+    return active.sum(axis=1), {category: active[:, index].sum(axis=1)
+                                for category, index in category_index(signals).items()}
@@ -0,0 +1,118 @@
+"""
+Columnar on-disk cache of signal workbooks and CSV files.
+
+The first read of a source file (001.xlsx, 002.csv, d1-d30.csv, ...) parses it
+once and writes it as a signal store (signal_store.py): one .npy file per
+column, the bit-packed boolean signals and the categorical dictionary codes,
+plus a meta.json describing the source. Later reads memory-map those arrays
+instead of re-parsing, and the batch classifier scores straight from the maps.
+
+A cache entry is keyed by the source path, size, mtime and content hash:
+  - same size and mtime          -> served without touching the source
+  - mtime changed, same content  -> served, and the new mtime is recorded
+  - content changed              -> the entry is rebuilt automatically
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+
+from signal_loader import apply_schema, read_raw_signal_file, source_rows
+from signal_store import SignalStore, read_meta, write_meta, write_store
+
+CACHE_DIR_NAME = '.signal_cache'
+# 5 was the layout with derived.npy; 6 keeps categorical values such as "None" instead of reading them as missing;
+# 7 records where each row sits in the source and which source columns are floats
+CACHE_VERSION = 7
+
+_HASH_BLOCK_SIZE = 1 << 20
+
+
+def file_digest(path):
+    """BLAKE2b hex digest of a file's content"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def default_cache_dir(source_path):
+    return os.path.join(os.path.dirname(os.path.abspath(source_path)), CACHE_DIR_NAME)
+
+
+def entry_dir(source_path, cache_dir=None):
+    """Cache directory for one source file (one entry per absolute path)"""
+    source_path = os.path.abspath(source_path)
+    cache_dir = cache_dir or default_cache_dir(source_path)
+    path_key = hashlib.blake2b(source_path.encode('utf-8'), digest_size=8).hexdigest()
+    return os.path.join(cache_dir, f'{os.path.basename(source_path)}-{path_key}')
+
+
+def _is_fresh(entry, meta, source_path):
+    """Check a cache entry against the source; refresh the recorded mtime when only that changed"""
+    if meta is None or meta.get('version') != CACHE_VERSION:
+        return False
+    stat = os.stat(source_path)
+    if meta['size'] != stat.st_size:
+        return False
+    if meta['mtime_ns'] == stat.st_mtime_ns:
+        return True
+    if meta['digest'] != file_digest(source_path):
+        return False
+    meta['mtime_ns'] = stat.st_mtime_ns
+    write_meta(entry, meta)
+    return True
+
+
+def write_cache(df, source_path, cache_dir=None, raw=None):
+    """Write a typed signal table as the cache entry (a signal store) of a source file; return the entry directory.
+
+    With the raw table it was typed from, the entry also records the source
+    position of each row and the source's float columns, so data_id_index.py
+    can read selected rows straight from the source as they were written.
+    """
+    source_path = os.path.abspath(source_path)
+    entry = entry_dir(source_path, cache_dir)
+    os.makedirs(os.path.dirname(entry), exist_ok=True)
+    stat = os.stat(source_path)
+
+    tmp_entry = tempfile.mkdtemp(prefix='.tmp-', dir=os.path.dirname(entry))
+    try:
+        write_store(df, tmp_entry, {
+            'version': CACHE_VERSION,
+            'source': source_path,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'digest': file_digest(source_path),
+            'source_floats': [] if raw is None else [str(name) for name, dtype in raw.dtypes.items() if dtype.kind == 'f'],
+        }, None if raw is None else source_rows(raw))
+
+        # Swap the finished entry in so readers never see a half-written cache
+        if os.path.exists(entry):
+            shutil.rmtree(entry)
+        os.replace(tmp_entry, entry)
+    except BaseException:
+        shutil.rmtree(tmp_entry, ignore_errors=True)
+        raise
+    return entry
+
+
+def open_cached_store(source_path, cache_dir=None):
+    """Memory-mapped SignalStore for a source file, building the cache entry if needed"""
+    entry = entry_dir(source_path, cache_dir)
+    if not _is_fresh(entry, read_meta(entry), source_path):
+        raw = read_raw_signal_file(source_path)
+        entry = write_cache(apply_schema(raw), source_path, cache_dir, raw)
+    return SignalStore(entry)
+
+
+def load_cached_table(source_path, cache_dir=None):
+    """Typed signal table for a source file, backed by the memory-mapped cache"""
+    return open_cached_store(source_path, cache_dir).frame()
+
+
+def clear_cache(source_path, cache_dir=None):
+    """Drop the cache entry for a source file"""
+    shutil.rmtree(entry_dir(source_path, cache_dir), ignore_errors=True)
@@ -0,0 +1,151 @@
+"""
+Load signal files (001.xlsx, 002.csv, d1-d30.csv, ...) as typed tables.
+
+Columns are renamed to canonical signal names and cast to the compact dtypes
+from the signal schema. By default tables are served from the columnar cache
+in signal_cache.py, so a workbook is only parsed the first time it is read.
+iter_signal_chunks streams a file as fixed-size typed chunks for inputs that
+do not fit in memory.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from signal_schema import DATA_ID, canonical_columns, compact_dtypes, na_values
+
+DATA_ID_PATTERN = re.compile(r'^D\d+$')
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+def apply_schema(df):
+    """Rename columns to canonical signal names and cast them to compact dtypes in bulk"""
+    df = df.rename(columns=canonical_columns(df.columns))
+    df[DATA_ID] = df[DATA_ID].astype(str).str.strip()
+    df = df[df[DATA_ID].str.match(DATA_ID_PATTERN)].reset_index(drop=True)
+
+    dtypes = {}
+    for name, dtype in compact_dtypes().items():
+        if name not in df.columns:
+            continue
+        # Missing values cannot be held by the integer layouts
+        if dtype in ('uint8', 'int32') and df[name].hasnans:
+            dtype = 'float32'
+        dtypes[name] = dtype
+    return df.astype(dtypes)
+
+
+def data_id_numbers(data_ids):
+    """Numeric part of Data IDs ('D123' -> 123) as an int64 array"""
+    return data_ids.str[1:].astype('int64').to_numpy()
+
+
+def _na_options(columns):
+    """read_csv / read_excel options reading signal_schema.na_values as missing in each column"""
+    return {'keep_default_na': False, 'na_values': {column: sorted(na_values(column)) for column in columns}}
+
+
+def _is_excel(path):
+    return str(path).lower().endswith(('.xlsx', '.xls'))
+
+
+def read_raw_signal_file(path):
+    """Parse a signal file (CSV or XLSX) as written: original headers and values, nothing renamed or cast.
+
+    Missing cells are those of signal_schema.na_values, so a categorical value
+    such as tls_version 'None' is kept rather than read as missing.
+    """
+    read = pd.read_excel if _is_excel(path) else pd.read_csv
+    return read(path, **_na_options(read(path, nrows=0).columns))
+
+
+def read_signal_file(path):
+    """Parse a signal file (CSV or XLSX) and return it typed by the signal schema"""
+    return apply_schema(read_raw_signal_file(path))
+
+
+def source_rows(raw):
+    """Positions in a raw signal table of the rows apply_schema keeps (those with a Data ID)"""
+    data_id = next(column for column, name in canonical_columns(raw.columns).items() if name == DATA_ID)
+    return np.flatnonzero(raw[data_id].astype(str).str.strip().str.match(DATA_ID_PATTERN).to_numpy())
+
+
+def raw_rows(raw, rows):
+    """Rows of a raw signal table at the row offsets of its typed table.
+
+    apply_schema drops rows without a Data ID (blank or header lines), so the
+    offsets are mapped back through the rows it keeps.
+    """
+    return raw.iloc[source_rows(raw)[rows]]
+
+
+def read_raw_rows(path, positions, float_columns=()):
+    """Only the raw rows at the given positions (see source_rows) of a signal file.
+
+    Parsing stops at the last of them. float_columns are the columns a whole-file
+    read_raw_signal_file parses as floats; naming them keeps their values as
+    that read writes them, where a few whole numbers alone would lose the '.0'.
+    """
+    read = pd.read_excel if _is_excel(path) else pd.read_csv
+    # Line 0 is the header
+    lines = set((np.asarray(positions, dtype=np.int64) + 1).tolist())
+    return read(path, skiprows=lambda line: line > 0 and line not in lines, nrows=len(lines),
+                dtype=dict.fromkeys(float_columns, 'float64'), **_na_options(read(path, nrows=0).columns))
+
+
+def load_signal_table(path, use_cache=True):
+    """Typed signal table for a file, read through the columnar cache unless use_cache is False"""
+    if not use_cache:
+        return read_signal_file(path)
+
+    from signal_cache import load_cached_table
+    return load_cached_table(path)
+
+
+def _mark_missing(frame):
+    """Cells of a frame built from raw workbook values that read_excel would read as missing"""
+    for column in frame.columns:
+        if not pd.api.types.is_numeric_dtype(frame[column]):
+            frame[column] = frame[column].mask(frame[column].isin(na_values(column)))
+    return frame
+
+
+def _iter_xlsx_frames(path, chunk_size):
+    # read_only mode streams rows from the sheet XML instead of loading the workbook
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        buffer = []
+        for row in rows:
+            buffer.append(row)
+            if len(buffer) == chunk_size:
+                yield _mark_missing(pd.DataFrame(buffer, columns=header))
+                buffer = []
+        if buffer:
+            yield _mark_missing(pd.DataFrame(buffer, columns=header))
+    finally:
+        workbook.close()
+
+
+def iter_signal_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield a signal file as typed tables of at most chunk_size rows.
+
+    Only one chunk is held in memory at a time, so peak memory is bounded by
+    the chunk size rather than the file size.
+    """
+    if _is_excel(path):
+        frames = _iter_xlsx_frames(path, chunk_size)
+    else:
+        frames = pd.read_csv(path, chunksize=chunk_size, **_na_options(pd.read_csv(path, nrows=0).columns))
+
+    for frame in frames:
+        chunk = apply_schema(frame)
+        if len(chunk):
+            yield chunk
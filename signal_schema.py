@@ -0,0 +1,281 @@
+"""
+Typed signal schema compiled from Detection_Signals_Essentials_1.0.csv.
+
+The catalog is read once and cached. Every detection signal gets a canonical
+name, a dtype (bool/int/float/categorical), a polarity (does a higher value mean
+a better or a worse email) and the column aliases it appears under in the data
+files, e.g. 'sender_known_malicios', 'malicious_attachment_Count' or the
+'Data ' header with a trailing space. Categorical signals also get the fixed
+value dictionary documented in the catalog, used to encode them as small
+integer codes.
+
+Only the standard library is used here so that the schema is cheap to import.
+"""
+
+import csv
+import functools
+import os
+import re
+from collections import namedtuple
+
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Detection_Signals_Essentials_1.0.csv')
+
+# Canonical name of the email identifier column ('Data ' in the source files)
+DATA_ID = 'Data'
+
+BOOL, INT, FLOAT, CATEGORICAL = 'bool', 'int', 'float', 'categorical'
+HIGHER_IS_BAD, HIGHER_IS_GOOD = 'higher_is_bad', 'higher_is_good'
+
+SignalSpec = namedtuple('SignalSpec', ['name', 'dtype', 'polarity', 'category', 'aliases', 'description', 'values'])
+
+# Catalog 'Type' values -> schema dtype
+_TYPE_MAP = {
+    'bool': BOOL,
+    'int': INT,
+    'float': FLOAT,
+    'categorical': CATEGORICAL,
+    'enum': CATEGORICAL,
+    # The QR-code row stores a 0/1 malicious verdict
+    'verdict - malicious or non-malicious': BOOL,
+}
+
+# Headers used in the data files (001.xlsx, 002.csv, d1-d30.csv) that differ from the catalog
+_EXTRA_ALIASES = {
+    'sender_known_malicious': ['sender_known_malicios'],
+    'malicious_attachment_count': ['malicious_attachment_Count'],
+    'reply_path_reputation_score': ['reply_path_reputation_Score'],
+    'url_count': ['url_Count'],
+    'dns_morphing_detected': ['dna_morphing_detected'],
+    'marketing_keywords_detected': ['marketing-keywords_detected'],
+    'analysis_of_the_qrcode_if_present': ['Analysis_of_the_qrcode_if_present'],
+}
+
+# Signals whose Type Explanation is ambiguous about which end is good
+_POLARITY_OVERRIDES = {
+    # "1.0(matched)" here means the sender name matches a VIP, i.e. impersonation
+    'sender_name_similarity_to_vip': HIGHER_IS_BAD,
+    'domain_tech_stack_match_score': HIGHER_IS_GOOD,
+}
+
+_GOOD_LABELS = ('good', 'trustworthy', 'non-malicious', 'not suspicious', 'enforced')
+
+# Categorical values spelled differently in the data files than in the catalog
+# ('self signed' vs 'self_signed' is already covered by the value normalization)
+_VALUE_ALIASES = {
+    'tls_version': {'SSL': 'SSL 3.0'},
+}
+
+# Category codes: 0 is a missing value, 1..k the catalog values in order, k + 1 anything else
+MISSING_CODE = 0
+
+# Strings pandas.read_csv reads as missing by default
+NA_VALUES = frozenset([
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+])
+
+# Label attached to the value 1 / 1.0 in a Type Explanation, e.g. "1.0(trustworthy)"
+_ONE_LABEL = re.compile(r'(?<![\d.])1(?:\.0)?\s*\(([^)]*)\)')
+
+# Signal groups used by every report and rule; each catalog signal belongs to exactly one
+CATEGORIES = ('sender', 'auth', 'attachment', 'behavioral', 'url', 'content')
+OTHER_CATEGORY = 'other'
+
+_CATEGORY_MEMBERS = {
+    'sender': [
+        'sender_known_malicious', 'sender_domain_reputation_score', 'sender_spoof_detected',
+        'sender_temp_email_likelihood', 'return_path_mismatch_with_from', 'return_path_known_malicious',
+        'return_path_reputation_score', 'reply_path_known_malicious', 'reply_path_diff_from_sender',
+        'reply_path_reputation_score', 'smtp_ip_known_malicious', 'smtp_ip_geo', 'smtp_ip_asn',
+        'smtp_ip_reputation_score', 'domain_known_malicious', 'dns_morphing_detected',
+        'domain_tech_stack_match_score', 'sender_name_similarity_to_vip',
+    ],
+    'auth': [
+        'dmarc_enforced', 'spf_result', 'dkim_result', 'dmarc_result', 'reverse_dns_valid', 'tls_version',
+    ],
+    'attachment': [
+        'packer_detected', 'any_file_hash_malicious', 'max_metadata_suspicious_score',
+        'malicious_attachment_count', 'has_executable_attachment', 'unscannable_attachment_present',
+        'total_components_detected_malicious', 'total_yara_match_count', 'total_ioc_count',
+        'any_macro_enabled_document', 'any_vbscript_javascript_detected', 'any_active_x_objects_detected',
+        'total_embedded_file_count', 'max_suspicious_string_entropy_score',
+    ],
+    'behavioral': [
+        'max_behavioral_sandbox_score', 'max_amsi_suspicion_score', 'any_network_call_on_open',
+        'max_exfiltration_behavior_score', 'any_exploit_pattern_detected', 'max_sandbox_execution_time',
+        'unique_parent_process_names',
+    ],
+    'url': [
+        'url_count', 'total_links_detected', 'url_shortener_detected', 'url_redirect_chain_length',
+        'final_url_known_malicious', 'url_decoded_spoof_detected', 'url_reputation_score',
+        'ssl_validity_status', 'site_visual_similarity_to_known_brand', 'url_rendering_behavior_score',
+        'link_rewritten_through_redirector', 'token_validation_success', 'analysis_of_the_qrcode_if_present',
+    ],
+    'content': [
+        'is_high_risk_role_targeted', 'urgency_keywords_present', 'request_type', 'content_spam_score',
+        'user_marked_as_spam_before', 'bulk_message_indicator', 'unsubscribe_link_present',
+        'marketing_keywords_detected', 'html_text_ratio', 'image_only_email',
+    ],
+}
+_SIGNAL_CATEGORY = {name: category for category, names in _CATEGORY_MEMBERS.items() for name in names}
+
+# Compact storage dtypes for loaders
+COMPACT_DTYPES = {
+    BOOL: 'uint8',
+    INT: 'int32',
+    FLOAT: 'float32',
+    CATEGORICAL: 'category',
+}
+
+
+def normalize_column(name):
+    """Case/punctuation-insensitive form of a column header"""
+    return re.sub(r'[\s\-]+', '_', str(name).strip()).lower()
+
+
+def _polarity(name, dtype, explanation):
+    if dtype == CATEGORICAL:
+        return None
+    if name in _POLARITY_OVERRIDES:
+        return _POLARITY_OVERRIDES[name]
+    match = _ONE_LABEL.search(explanation)
+    if match and match.group(1).strip().lower().startswith(_GOOD_LABELS):
+        return HIGHER_IS_GOOD
+    # Counts, risk scores and "1(malicious)"-style flags
+    return HIGHER_IS_BAD
+
+
+def _category_values(explanation):
+    """Fixed value dictionary from a categorical Type Explanation, in catalog order"""
+    # One numbered line per value: '2.fail - The IP is ...' or '1. ""invoice_payment"":Request to ...'
+    numbered = re.findall(r'^\s*\d+\s*[.:]\s*"?(\w+)', explanation, re.MULTILINE)
+    if numbered:
+        return tuple(dict.fromkeys(numbered))
+    # tls_version: [TLS 1.3,TLS 1.2, ..., SSL 3.0(outdated), None(no encrytion)]
+    listed = re.search(r'\[([^\]]*)\]', explanation)
+    if listed:
+        values = (re.sub(r'\(.*?\)', '', value).strip() for value in listed.group(1).split(','))
+        return tuple(dict.fromkeys(value for value in values if value))
+    return ()
+
+
+@functools.lru_cache(maxsize=None)
+def load_schema(path=CATALOG_PATH):
+    """Parse the signal catalog into an ordered {canonical name: SignalSpec} dict (cached)"""
+    schema = {}
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            raw_name = row['Signal Name'].strip()
+            if not raw_name:
+                continue
+            name = normalize_column(raw_name)
+            dtype = _TYPE_MAP[row['Type'].strip().lower()]
+            aliases = {raw_name, name} | set(_EXTRA_ALIASES.get(name, []))
+            schema[name] = SignalSpec(
+                name=name,
+                dtype=dtype,
+                polarity=_polarity(name, dtype, row['Type Explanation']),
+                category=_SIGNAL_CATEGORY.get(name, OTHER_CATEGORY),
+                aliases=tuple(sorted(aliases)),
+                description=row['Detailed description'].strip(),
+                values=_category_values(row['Type Explanation']) if dtype == CATEGORICAL else (),
+            )
+    return schema
+
+
+@functools.lru_cache(maxsize=None)
+def _alias_lookup(path=CATALOG_PATH):
+    lookup = {normalize_column(DATA_ID): DATA_ID}
+    for spec in load_schema(path).values():
+        for alias in spec.aliases:
+            lookup[normalize_column(alias)] = spec.name
+    return lookup
+
+
+def canonical_name(column, path=CATALOG_PATH):
+    """Canonical signal name for a data column header, or None if it is not a known signal"""
+    return _alias_lookup(path).get(normalize_column(column))
+
+
+def canonical_columns(columns, path=CATALOG_PATH):
+    """Map each known column header to its canonical name; unknown headers are left out"""
+    mapping = {}
+    for column in columns:
+        name = canonical_name(column, path)
+        if name is not None:
+            mapping[column] = name
+    return mapping
+
+
+def signals_of_type(dtype, path=CATALOG_PATH):
+    """Canonical names of every signal with the given dtype, in catalog order"""
+    return [spec.name for spec in load_schema(path).values() if spec.dtype == dtype]
+
+
+def _value_key(value):
+    return re.sub(r'[\s\-]+', '_', str(value).strip()).lower()
+
+
+@functools.lru_cache(maxsize=None)
+def category_codes(name, path=CATALOG_PATH):
+    """{normalized value: code} for a categorical signal, including the data-file spellings"""
+    values = load_schema(path)[name].values
+    codes = {'': MISSING_CODE}
+    for code, value in enumerate(values, start=1):
+        codes[_value_key(value)] = code
+    for alias, value in _VALUE_ALIASES.get(name, {}).items():
+        codes[_value_key(alias)] = codes[_value_key(value)]
+    return codes
+
+
+def other_code(name, path=CATALOG_PATH):
+    """Code shared by every value of a categorical signal that is not in its catalog dictionary"""
+    return len(load_schema(path)[name].values) + 1
+
+
+def encode_category(name, value, path=CATALOG_PATH):
+    """Code of one categorical value (case, whitespace and '-'/'_' insensitive)"""
+    if value is None or value != value:
+        return MISSING_CODE
+    return category_codes(name, path).get(_value_key(value), other_code(name, path))
+
+
+@functools.lru_cache(maxsize=None)
+def na_values(column, path=CATALOG_PATH):
+    """Strings that read as missing in a data column.
+
+    These are pandas' defaults, except for the values in a categorical
+    signal's dictionary: 'None' is the tls_version of an unencrypted email
+    and 'none' an SPF, DKIM or DMARC result, not missing values.
+    """
+    spec = load_schema(path).get(canonical_name(column, path))
+    if spec is None or spec.dtype != CATEGORICAL:
+        return NA_VALUES
+    name = spec.name
+    codes = category_codes(name, path)
+    return frozenset(value for value in NA_VALUES if codes.get(_value_key(value), MISSING_CODE) == MISSING_CODE)
+
+
+def compact_dtypes(path=CATALOG_PATH):
+    """{canonical name: compact storage dtype} for every signal"""
+    return {spec.name: COMPACT_DTYPES[spec.dtype] for spec in load_schema(path).values()}
+
+
+def category_index(columns, path=CATALOG_PATH):
+    """{category: integer array of positions in columns} for every category in CATEGORIES.
+
+    Columns that are not catalog signals (other than the Data ID) are grouped under
+    OTHER_CATEGORY. Per-email category counts are then a single reduction, e.g.
+    active[:, index['sender']].sum(axis=1).
+    """
+    import numpy as np
+
+    schema = load_schema(path)
+    positions = {category: [] for category in CATEGORIES + (OTHER_CATEGORY,)}
+    for i, column in enumerate(columns):
+        name = canonical_name(column, path)
+        if name == DATA_ID:
+            continue
+        spec = schema.get(name)
+        positions[spec.category if spec else OTHER_CATEGORY].append(i)
+    return {category: np.array(index, dtype=np.intp) for category, index in positions.items()}
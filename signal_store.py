@@ -0,0 +1,182 @@
+"""
+Read-only, memory-mapped signal store shared by every process that reads it.
+
+A store is a directory holding each signal as one contiguous .npy array, plus
+the blocks the scoring engine works on directly:
+  - booleans.npy  every boolean signal of the catalog, bit-packed (bitpack.py)
+  - codes.npy     categorical signals as int8 dictionary codes, one column per signal
+  - id_*.npy      the Data ID index (data_id_index.py)
+  - source_rows.npy  row positions in the source file, when it has rows
+                     without a Data ID that the store leaves out
+  - meta.json     row count and the column layout
+
+Opening a store only reads meta.json; arrays are memory-mapped on first use.
+SignalStore.matrix builds a SignalMatrix from slices of those maps without
+copying, so any number of workers can open the same store and score their
+own row ranges while the operating system keeps a single copy of the data in
+the page cache.
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from bitpack import BOOL_SIGNALS, BooleanPack, pack_frame
+from data_id_index import build_index, load_index, save_index
+from scoring_engine import CATEGORICAL_SIGNALS, SignalMatrix, build_category_block, category_columns
+from signal_loader import data_id_numbers
+from signal_schema import DATA_ID
+
+STORE_VERSION = 2
+
+META_FILE = 'meta.json'
+BOOLEANS_FILE = 'booleans.npy'
+CODES_FILE = 'codes.npy'
+SOURCE_ROWS_FILE = 'source_rows.npy'
+
+
+def read_meta(directory):
+    """meta.json of a store, or None if it is missing or unreadable"""
+    try:
+        with open(os.path.join(directory, META_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_meta(directory, meta):
+    tmp_path = os.path.join(directory, META_FILE + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f, indent=1)
+    os.replace(tmp_path, os.path.join(directory, META_FILE))
+
+
+def write_store(df, directory, meta=None, positions=None):
+    """Write a typed signal table as a signal store in an existing, empty directory.
+
+    Boolean columns without missing values live only in booleans.npy; every
+    other column gets its own file. Extra meta entries (source path, digest,
+    ...) are stored alongside the layout. positions are the rows' positions in
+    their source file (signal_loader.source_rows), if not simply 0..n-1.
+    """
+    np.save(os.path.join(directory, BOOLEANS_FILE), pack_frame(df).words, allow_pickle=False)
+    np.save(os.path.join(directory, CODES_FILE), build_category_block(df), allow_pickle=False)
+    index_meta = save_index(build_index(data_id_numbers(df[DATA_ID])), directory)
+    moved = positions is not None and not np.array_equal(positions, np.arange(len(df)))
+    if moved:
+        np.save(os.path.join(directory, SOURCE_ROWS_FILE), np.asarray(positions, dtype=np.int64), allow_pickle=False)
+
+    columns = []
+    for i, name in enumerate(df.columns):
+        column = df[name]
+        if name in BOOL_SIGNALS and column.dtype == np.uint8:
+            # Bit position in booleans.npy
+            columns.append({'name': name, 'packed': BOOL_SIGNALS.index(name)})
+            continue
+        spec = {'name': name, 'file': f'{i:03d}.npy'}
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            spec['categories'] = [str(value) for value in column.cat.categories]
+            values = column.cat.codes.to_numpy(dtype=np.int16)
+        elif name == DATA_ID:
+            values = column.to_numpy(dtype=str)
+        else:
+            values = column.to_numpy()
+        np.save(os.path.join(directory, spec['file']), values, allow_pickle=False)
+        columns.append(spec)
+
+    write_meta(directory, {**(meta or {}), **index_meta, 'source_rows': moved,
+                           'store_version': STORE_VERSION, 'rows': len(df), 'columns': columns})
+
+
+class SignalStore:
+    """A signal store opened for reading; arrays are memory-mapped on first access"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.meta = read_meta(directory)
+        if self.meta is None or self.meta.get('store_version') != STORE_VERSION:
+            raise ValueError(f"{directory}: not a signal store (version {STORE_VERSION})")
+        self.specs = {spec['name']: spec for spec in self.meta['columns']}
+        self._arrays = {}
+        self._index = None
+
+    def __len__(self):
+        return self.meta['rows']
+
+    @property
+    def columns(self):
+        return list(self.specs)
+
+    def _array(self, file):
+        if file not in self._arrays:
+            self._arrays[file] = np.load(os.path.join(self.directory, file), mmap_mode='r')
+        return self._arrays[file]
+
+    @property
+    def booleans(self):
+        return BooleanPack(self._array(BOOLEANS_FILE), BOOL_SIGNALS)
+
+    @property
+    def codes(self):
+        """int8 dictionary codes, one column per entry of CATEGORICAL_SIGNALS"""
+        return self._array(CODES_FILE)
+
+    @property
+    def data_ids(self):
+        return self.column(DATA_ID)
+
+    @property
+    def index(self):
+        """DataIdIndex of the stored rows"""
+        if self._index is None:
+            self._index = load_index(self.directory, self.meta)
+        return self._index
+
+    def source_positions(self, rows):
+        """Positions in the source file of the given row offsets"""
+        if not self.meta.get('source_rows'):
+            return np.asarray(rows, dtype=np.int64)
+        return self._array(SOURCE_ROWS_FILE)[rows]
+
+    def column(self, name, rows=None):
+        """Stored values of one column, for all rows or the given row offsets (int16 codes for categorical columns)"""
+        spec = self.specs[name]
+        if 'packed' in spec:
+            booleans = self.booleans if rows is None else self.booleans.take(rows)
+            return booleans.column(name)
+        values = self._array(spec['file'])
+        return values if rows is None else values[rows]
+
+    def categories(self, name):
+        """Category labels of a categorical column, or None"""
+        return self.specs[name].get('categories')
+
+    def frame(self, rows=None):
+        """The stored table, or the given row offsets of it, as a typed DataFrame.
+
+        Whole-table columns are not copied where pandas allows.
+        """
+        data = {}
+        for name in self.specs:
+            categories = self.categories(name)
+            if categories is not None:
+                data[name] = pd.Categorical.from_codes(self.column(name, rows), categories)
+            else:
+                data[name] = self.column(name, rows)
+        return pd.DataFrame(data, copy=False)
+
+    def numeric_signals(self):
+        """Stored columns the scoring engine reads as numbers"""
+        return [name for name, spec in self.specs.items()
+                if 'file' in spec and 'categories' not in spec and name != DATA_ID
+                and name not in BOOL_SIGNALS and name not in CATEGORICAL_SIGNALS
+                and self._array(spec['file']).dtype.kind in 'iuf']
+
+    def matrix(self, start=0, stop=None):
+        """Zero-copy SignalMatrix over rows [start, stop)"""
+        rows = slice(start, len(self) if stop is None else stop)
+        numeric = {name: self._array(self.specs[name]['file'])[rows] for name in self.numeric_signals()}
+        booleans = BooleanPack(self._array(BOOLEANS_FILE)[rows], BOOL_SIGNALS)
+        return SignalMatrix(numeric, category_columns(self.codes[rows]), booleans)
@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(scope='session')
+def synthetic_df():
+    """300 synthetic emails following 002.csv; the last 100 repeat the signals of the first 100"""
+    from benchmark import synthetic_table
+    from signal_schema import DATA_ID
+
+    df = synthetic_table(200, reference=os.path.join(ROOT, '002.csv'), seed=7)
+    repeats = df.iloc[:100].copy()
+    repeats[DATA_ID] = [f'D{number}' for number in range(201, 301)]
+    return pd.concat([df, repeats], ignore_index=True)
+
+
+@pytest.fixture
+def signal_csv(tmp_path, synthetic_df):
+    path = tmp_path / 'signals.csv'
+    synthetic_df.to_csv(path, index=False)
+    return str(path)
@@ -0,0 +1,96 @@
+import http.client
+import json
+import threading
+
+import pytest
+
+from classify_service import MAX_BODY_SIZE, make_server
+from scoring_engine import label_names, required_signals, score_table
+from signal_schema import DATA_ID
+
+
+@pytest.fixture(scope='module')
+def service():
+    server = make_server(port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+def request(port, method, path, body=None, headers=None):
+    """(status, Content-Type, body) of one request on a fresh connection"""
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    connection.putrequest(method, path)
+    for name, value in (headers or {}).items():
+        connection.putheader(name, value)
+    connection.endheaders(body)
+    response = connection.getresponse()
+    result = response.status, response.getheader('Content-Type'), response.read().decode()
+    connection.close()
+    return result
+
+
+def post(port, body, content_type='application/json'):
+    data = body.encode()
+    return request(port, 'POST', '/classify', data, {'Content-Type': content_type, 'Content-Length': len(data)})
+
+
+def full_record(data_id, **signals):
+    return {DATA_ID: data_id, **dict.fromkeys(required_signals()), **signals}
+
+
+def test_json_records_get_their_verdicts(service, synthetic_df):
+    rows = synthetic_df.iloc[:20]
+    status, content_type, body = post(service, json.dumps(rows.astype(object).to_dict('records'), default=str))
+    assert status == 200 and content_type == 'application/json'
+    assert json.loads(body) == {'results': [{DATA_ID: data_id, 'classification': label} for data_id, label
+                                            in zip(rows[DATA_ID], label_names(score_table(rows)[0]))]}
+
+    # A single object is one record
+    status, _, body = post(service, json.dumps(full_record('D9', sender_known_malicious=1)))
+    assert json.loads(body) == {'results': [{DATA_ID: 'D9', 'classification': 'Malicious'}]}
+
+
+def test_csv_records_get_outcome_lines(service, synthetic_df):
+    rows = synthetic_df.iloc[:20]
+    status, content_type, body = post(service, rows.to_csv(index=False), 'text/csv')
+    assert status == 200 and content_type == 'text/csv'
+    expected = ''.join(f'{data_id},{label}\n' for data_id, label in zip(rows[DATA_ID], label_names(score_table(rows)[0])))
+    assert body == expected
+
+
+def test_malformed_bodies_are_rejected(service):
+    assert post(service, '{"Data": "D1"')[0] == 400
+    assert post(service, '[1, 2]')[0] == 400
+    status, _, body = post(service, 'Data,url_count\nD1,3,4\n', 'text/csv')
+    assert status == 400 and 'more cells than the header' in json.loads(body)['error']
+
+
+def test_unknown_and_missing_fields_are_listed(service):
+    status, _, body = post(service, '{}')
+    error = json.loads(body)
+    assert status == 400 and error['unknown_fields'] == [] and error['missing_signals'] == required_signals()
+
+    record = full_record('D1', sender_known_malicous=1, url_count=2)
+    del record['content_spam_score']
+    status, _, body = post(service, json.dumps([full_record('D0'), record]))
+    error = json.loads(body)
+    assert status == 400
+    assert error['unknown_fields'] == ['sender_known_malicous']
+    assert error['missing_signals'] == ['content_spam_score']
+    assert 'sender_known_malicous' in error['error'] and 'content_spam_score' in error['error']
+
+
+def test_content_length_is_required_and_bounded(service):
+    assert request(service, 'POST', '/classify', b'{}')[0] == 411
+    assert request(service, 'POST', '/classify', b'{}', {'Content-Length': '-2'})[0] == 400
+    assert request(service, 'POST', '/classify', b'{}', {'Content-Length': 'two'})[0] == 400
+    assert request(service, 'POST', '/classify', None, {'Content-Length': MAX_BODY_SIZE + 1})[0] == 413
+
+
+def test_health_and_unknown_paths(service):
+    status, _, body = request(service, 'GET', '/health')
+    assert status == 200 and json.loads(body)['status'] == 'ok'
+    assert request(service, 'GET', '/classify')[0] == 404
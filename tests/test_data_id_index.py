@@ -0,0 +1,114 @@
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_id_index import build_index, load_index, parse_id_range, save_index
+from signal_cache import open_cached_store
+from signal_loader import raw_rows, read_raw_rows, read_raw_signal_file
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('D32', (32, 32)),
+    ('32', (32, 32)),
+    ('d51-d55', (51, 55)),
+    (' D51 - D55 ', (51, 55)),
+    ('D51-55', (51, 55)),
+])
+def test_parse_id_range(text, expected):
+    assert parse_id_range(text) == expected
+
+
+@pytest.mark.parametrize('text', ['', 'D', 'X51', 'D51-', 'D51-D55-D60', 'D5.5'])
+def test_parse_id_range_rejects(text):
+    with pytest.raises(ValueError):
+        parse_id_range(text)
+
+
+# Row i holds Data ID numbers[i]: unordered, with a gap and a repeated ID
+NUMBERS = [7, 3, 5, 4, 10, 5, 12]
+
+
+@pytest.fixture(params=['dense', 'sparse'])
+def index(request):
+    numbers = NUMBERS if request.param == 'dense' else [number * 1000 for number in NUMBERS]
+    index = build_index(numbers)
+    assert (index.offsets is not None) == (request.param == 'dense')
+    return index, 1 if request.param == 'dense' else 1000
+
+
+def test_lookup(index):
+    index, scale = index
+    assert index.lookup(7 * scale) == 0
+    assert index.lookup(f'D{3 * scale}') == 1
+    # The first row of a repeated ID wins
+    assert index.lookup(5 * scale) == 2
+    for absent in [1, 6, 11, 13, 100]:
+        assert index.lookup(absent * scale) is None
+
+
+def test_lookup_many(index):
+    index, scale = index
+    queries = np.array([12, 5, 6, 3, 0, 99, 7]) * scale
+    assert index.lookup_many(queries).tolist() == [6, 2, -1, 1, -1, -1, 0]
+    assert index.lookup_many([]).tolist() == []
+
+
+def test_range(index):
+    index, scale = index
+    # Rows in file order, repeated IDs included
+    assert index.range(4 * scale, 7 * scale).tolist() == [0, 2, 3, 5]
+    assert index.range(8 * scale, 9 * scale).tolist() == []
+    assert index.range(0, 100 * scale).tolist() == list(range(len(NUMBERS)))
+
+
+def test_select():
+    index = build_index(NUMBERS)
+    assert index.select('D10-D12').tolist() == [4, 6]
+    assert index.select('D5').tolist() == [2, 5]
+
+
+def test_empty_index():
+    index = build_index([])
+    assert index.lookup(1) is None
+    assert index.lookup_many([1, 2]).tolist() == [-1, -1]
+    assert index.range(0, 10).tolist() == []
+
+
+def test_save_and_load(tmp_path, index):
+    index, scale = index
+    meta = save_index(index, str(tmp_path))
+    loaded = load_index(str(tmp_path), meta)
+    queries = np.arange(0, 14) * scale
+    assert np.array_equal(loaded.lookup_many(queries), index.lookup_many(queries))
+    assert np.array_equal(loaded.range(4 * scale, 12 * scale), index.range(4 * scale, 12 * scale))
+
+
+@pytest.mark.parametrize('id_range', ['D51-D55', 'D96-D100'])
+def test_extracted_rows_match_committed_extract(tmp_path, id_range):
+    source = tmp_path / '001.xlsx'
+    shutil.copy(ROOT / '001.xlsx', source)
+    store = open_cached_store(str(source))
+    positions = store.source_positions(store.index.select(id_range))
+    extracted = read_raw_rows(str(source), positions, store.meta['source_floats']).to_csv(index=False)
+    first, last = id_range.split('-')
+    assert extracted == (ROOT / f'extracted_{first}_{last}_data.csv').read_text()
+
+
+def test_extracted_rows_skip_rows_without_data_id(tmp_path):
+    source = tmp_path / 'signals.csv'
+    source.write_text('Data ,spf_result,url_count\nD1,pass,1\n,x,\nD2,fail,2\ntotal,y,3\nD3,none,4\n')
+    store = open_cached_store(str(source))
+    assert store.source_positions(store.index.select('D2-D3')).tolist() == [2, 4]
+    extracted = read_raw_rows(str(source), store.source_positions(store.index.select('D2-D3')), store.meta['source_floats'])
+    expected = raw_rows(read_raw_signal_file(str(source)), store.index.select('D2-D3'))
+    assert extracted.to_csv(index=False) == expected.to_csv(index=False) == 'Data ,spf_result,url_count\nD2,fail,2.0\nD3,none,4.0\n'
+
+
+def test_raw_rows_skip_rows_without_data_id():
+    raw = pd.DataFrame({'Data ': ['D1', None, 'D2', 'total'], 'spf_result': ['pass', 'x', 'fail', 'y']})
+    assert raw_rows(raw, np.array([1])).to_dict('list') == {'Data ': ['D2'], 'spf_result': ['fail']}
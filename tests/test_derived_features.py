@@ -0,0 +1,38 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from derived_features import DERIVED_FEATURES, KNOWN_MALICIOUS, add_derived_columns, derive
+from report_builder import build_report, generate_reports
+from scoring_engine import build_signal_matrix
+from signal_cache import open_cached_store
+from signal_loader import load_signal_table
+
+
+def test_composites_follow_their_signals(synthetic_df):
+    m = build_signal_matrix(synthetic_df)
+    passes = sum((synthetic_df[name].astype(str).str.strip().str.lower() == 'pass').to_numpy()
+                 for name in ['spf_result', 'dkim_result', 'dmarc_result'])
+    assert np.array_equal(derive('auth_pass_count', m), passes)
+    known = synthetic_df[KNOWN_MALICIOUS].eq(1).any(axis=1).to_numpy()
+    assert np.array_equal(derive('any_known_malicious', m), known)
+
+
+def test_report_summary_has_a_column_per_composite(signal_csv, tmp_path):
+    df = load_signal_table(signal_csv, use_cache=False)
+    summary = tmp_path / 'summary.csv'
+    generate_reports([build_report(df)], str(tmp_path / 'report.txt'), str(summary))
+    written = pd.read_csv(summary)
+    expected = add_derived_columns(df)
+    for name in DERIVED_FEATURES:
+        assert np.allclose(written[name], expected[name], equal_nan=True), name
+
+
+def test_store_computes_derived_features_lazily(signal_csv):
+    store = open_cached_store(signal_csv)
+    assert not any(name.startswith('derived') for name in os.listdir(store.directory))
+    from_store = store.matrix()
+    from_table = build_signal_matrix(load_signal_table(signal_csv, use_cache=False))
+    for name in DERIVED_FEATURES:
+        assert np.array_equal(from_store.num(name), from_table.num(name), equal_nan=True), name
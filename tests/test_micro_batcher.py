@@ -0,0 +1,71 @@
+import asyncio
+import json
+
+from classify_service import classify_records
+from micro_batcher import MicroBatcher, handle_connection
+from scoring_engine import required_signals
+
+
+def record(data_id, **signals):
+    """A signal record with every signal the rules read, null unless given"""
+    return json.dumps({'Data': data_id, **dict.fromkeys(required_signals()), **signals})
+
+
+def serve_lines(classify, lines):
+    """Response lines of one connection that sends the given request lines"""
+    async def run():
+        batcher = MicroBatcher(classify, window=0.001, max_batch=2)
+        server = await asyncio.start_server(lambda r, w: handle_connection(batcher, r, w), '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(''.join(line + '\n' for line in lines).encode())
+        writer.write_eof()
+        responses = [json.loads(line) async for line in reader]
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return responses
+    return asyncio.run(run())
+
+
+def test_failed_batch_answers_each_request_with_an_error():
+    def classify(records):
+        if any(record.get('Data') == 'D2' for record in records):
+            raise RuntimeError('rules unavailable')
+        return [(record.get('Data'), 'No Action') for record in records]
+
+    lines = [record(f'D{i}') for i in range(1, 5)] + ['not json']
+    responses = serve_lines(classify, lines)
+    assert len(responses) == 5
+    # D1 and D2 share the failing batch; D3 and D4 are served normally afterwards
+    assert [response.get('Data') for response in responses[:4]] == ['D1', 'D2', 'D3', 'D4']
+    assert 'classification failed' in responses[0]['error'] and 'classification failed' in responses[1]['error']
+    assert responses[2]['classification'] == responses[3]['classification'] == 'No Action'
+    assert 'error' in responses[4]
+
+
+def test_short_result_list_is_an_error_not_a_hang():
+    responses = serve_lines(lambda records: [], [record('D1')])
+    assert responses == [{'Data': 'D1', 'error': 'classification failed: classifier returned 0 verdicts for 1 records'}]
+
+
+def test_real_verdicts_in_request_order(synthetic_df):
+    rows = synthetic_df.iloc[:6]
+    expected = classify_records(rows.to_dict('records'))
+    lines = [json.dumps(row, default=str) for row in rows.astype(object).to_dict('records')]
+    responses = serve_lines(classify_records, lines)
+    assert [(response['Data'], response['classification']) for response in responses] == expected
+
+
+def test_bad_records_are_rejected_alone():
+    lines = [record('D1', sender_known_malicious=1), '{"Data": "D2"', '[1, 2]',
+             record('D3', sender_known_malicous_typo=1), json.dumps({'Data': 'D4', 'url_count': 3}),
+             record('D5')]
+    responses = serve_lines(classify_records, lines)
+    assert responses[0] == {'Data': 'D1', 'classification': 'Malicious'}
+    assert set(responses[1]) == {'error'} and set(responses[2]) == {'error'}
+    assert responses[3]['Data'] == 'D3' and responses[3]['unknown_fields'] == ['sender_known_malicous_typo']
+    assert responses[3]['missing_signals'] == []
+    assert responses[4]['missing_signals'] == sorted(set(required_signals()) - {'url_count'})
+    assert 'missing signals' in responses[4]['error']
+    assert responses[5] == {'Data': 'D5', 'classification': 'No Action'}
@@ -0,0 +1,60 @@
+import numpy as np
+
+from classify_service import classify_records, parse_csv_records
+from quick_classify import classify_record, compile_policy, read_records
+from scoring_engine import NO_ACTION, WARNING, build_signal_matrix, label_names, score_table
+from signal_loader import iter_signal_chunks, load_signal_table
+from signal_schema import DATA_ID, MISSING_CODE, na_values
+
+# tls_version "None" is an unencrypted email (outdated_tls), '' and 'NA' are missing
+TLS_VERSIONS = ['None', 'TLS 1.2', '', 'NA', 'none', 'SSL']
+
+
+def _signal_file(synthetic_df, tmp_path):
+    df = synthetic_df.copy()
+    df['tls_version'] = [TLS_VERSIONS[i % len(TLS_VERSIONS)] for i in range(len(df))]
+    path = tmp_path / 'signals.csv'
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+def test_categorical_values_are_not_read_as_missing():
+    assert 'None' not in na_values('tls_version')
+    assert 'none' not in na_values('spf_result')
+    assert {'', 'NA', 'None'} <= na_values('ssl_validity_status')
+    assert 'None' in na_values('url_count')
+
+
+def test_batch_quick_and_service_paths_agree(synthetic_df, tmp_path):
+    path = _signal_file(synthetic_df, tmp_path)
+    df = load_signal_table(path, use_cache=False)
+    codes = build_signal_matrix(df).code('tls_version')
+    expected = label_names(score_table(df)[0])
+    tls = df['tls_version'].astype(object).to_numpy()
+    assert (codes[tls == 'None'] != MISSING_CODE).all()
+    assert (codes[::len(TLS_VERSIONS)] != MISSING_CODE).all()
+    assert (codes[2::len(TLS_VERSIONS)] == MISSING_CODE).all()
+
+    chunked = np.concatenate([label_names(score_table(chunk)[0]) for chunk in iter_signal_chunks(path, chunk_size=7)])
+    assert np.array_equal(chunked, expected)
+
+    policy = compile_policy()
+    quick = [classify_record(record, policy)[0] for _, record in read_records(path)]
+    assert quick == list(expected)
+
+    with open(path) as f:
+        served = classify_records(parse_csv_records(f.read()))
+    assert [label for _, label in served] == list(expected)
+    assert [data_id for data_id, _ in served] == list(df[DATA_ID])
+
+
+def test_tls_none_is_an_outdated_version(synthetic_df, tmp_path):
+    labels = score_table(synthetic_df)[0]
+    row = synthetic_df.iloc[[int(np.flatnonzero(labels == NO_ACTION)[0])]].copy()
+    row['tls_version'] = ['None']
+    path = tmp_path / 'row.csv'
+    row.to_csv(path, index=False)
+
+    assert score_table(load_signal_table(str(path), use_cache=False))[0][0] == WARNING
+    assert classify_record(read_records(str(path))[0][1], compile_policy())[0] == 'Warning'
+    assert classify_records([row.iloc[0].to_dict()])[0][1] == 'Warning'
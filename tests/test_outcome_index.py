@@ -0,0 +1,102 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import batch_classify
+from batch_classify import classify_incremental, write_outcome
+from outcome_index import index_path, load_index
+from rule_engine import RULES_PATH, policy_digest
+from scoring_engine import label_names, score_table
+from signal_loader import load_signal_table
+from signal_schema import DATA_ID
+
+
+def read_verdicts(path):
+    df = pd.read_csv(path, header=None, names=[DATA_ID, 'Classification'])
+    return dict(zip(df[DATA_ID], df['Classification']))
+
+
+def expected_verdicts(source):
+    df = load_signal_table(source, use_cache=False)
+    return dict(zip(df[DATA_ID], label_names(score_table(df)[0])))
+
+
+def test_second_run_skips_everything(signal_csv, tmp_path):
+    output = str(tmp_path / 'outcome.csv')
+    counts, skipped = classify_incremental(signal_csv, output)
+    assert skipped == 0 and sum(counts.values()) == 300
+    assert read_verdicts(output) == expected_verdicts(signal_csv)
+
+    counts, skipped = classify_incremental(signal_csv, output)
+    assert skipped == 300 and sum(counts.values()) == 0
+
+
+def test_changed_row_is_reclassified(signal_csv, tmp_path):
+    output = str(tmp_path / 'outcome.csv')
+    classify_incremental(signal_csv, output)
+
+    df = pd.read_csv(signal_csv)
+    df.loc[5, 'sender_known_malicious'] = 1 - df.loc[5, 'sender_known_malicious']
+    df.to_csv(signal_csv, index=False)
+    counts, skipped = classify_incremental(signal_csv, output)
+    assert skipped == 299 and sum(counts.values()) == 1
+    assert read_verdicts(output) == expected_verdicts(signal_csv)
+
+
+def test_outcome_rewritten_by_another_run_invalidates_index(signal_csv, tmp_path):
+    output = str(tmp_path / 'outcome.csv')
+    classify_incremental(signal_csv, output)
+    # A plain run over another source replaces the file (and drops its index)
+    write_outcome(['D1', 'D2'], ['Spam', 'Spam'], output)
+
+    counts, skipped = classify_incremental(signal_csv, output)
+    assert skipped == 0 and sum(counts.values()) == 300
+    assert read_verdicts(output) == expected_verdicts(signal_csv)
+
+
+def test_index_ignored_when_outcome_edited(signal_csv, tmp_path):
+    output = str(tmp_path / 'outcome.csv')
+    classify_incremental(signal_csv, output)
+    with open(output, 'a') as f:
+        f.write('D1,Warning\n')
+    assert len(load_index(output, signal_csv)[0]) == 0
+
+    counts, skipped = classify_incremental(signal_csv, output)
+    assert skipped == 0
+    assert read_verdicts(output) == expected_verdicts(signal_csv)
+
+
+def test_index_ignored_for_another_source(signal_csv, tmp_path):
+    output = str(tmp_path / 'outcome.csv')
+    classify_incremental(signal_csv, output)
+    other = str(tmp_path / 'other.csv')
+    with open(signal_csv) as src, open(other, 'w') as dst:
+        dst.write(src.read())
+
+    assert len(load_index(output, signal_csv)[0]) == 300
+    assert len(load_index(output, other)[0]) == 0
+    assert np.array_equal(np.sort(load_index(output)[0]), np.arange(1, 301))
+
+
+def test_write_outcome_drops_index(signal_csv, tmp_path):
+    output = str(tmp_path / 'outcome.csv')
+    classify_incremental(signal_csv, output)
+    write_outcome(['D1'], ['Spam'], output)
+    assert not os.path.exists(index_path(output))
+
+
+def test_changed_policy_invalidates_index(signal_csv, tmp_path, monkeypatch):
+    output = str(tmp_path / 'outcome.csv')
+    classify_incremental(signal_csv, output)
+    assert len(load_index(output, signal_csv, policy_digest())[0]) == 300
+
+    rules = tmp_path / 'rules.toml'
+    with open(RULES_PATH) as f:
+        rules.write_text(f.read().replace('content_spam_score >= 0.6', 'content_spam_score >= 0.0'))
+    assert policy_digest(str(rules)) != policy_digest()
+    assert len(load_index(output, signal_csv, policy_digest(str(rules)))[0]) == 0
+
+    monkeypatch.setattr(batch_classify, 'policy_digest', lambda: policy_digest(str(rules)))
+    counts, skipped = classify_incremental(signal_csv, output)
+    assert skipped == 0 and sum(counts.values()) == 300
@@ -0,0 +1,21 @@
+import numpy as np
+import pytest
+
+from pipeline_metrics import PipelineMetrics, reset_peak_rss
+
+
+@pytest.mark.skipif(not reset_peak_rss(), reason='peak RSS cannot be reset on this platform')
+def test_peak_rss_is_per_stage():
+    metrics = PipelineMetrics('test')
+    with metrics.stage('large'):
+        block = np.ones(25_000_000)
+        block[::512] = 2
+        del block
+    with metrics.stage('outer'):
+        with metrics.stage('inner'):
+            pass
+    stages = {record['stage']: record['peak_rss_mb'] for record in metrics.records()}
+    # 200 MB touched in 'large' must not be charged to the stages after it
+    assert stages['large'] - stages['outer'] > 150
+    assert stages['outer'] >= stages['inner'] > 0
+    assert stages['total'] >= stages['large']
@@ -0,0 +1,25 @@
+import pandas as pd
+
+from report_builder import select_range, stream_range
+
+
+def chunks(df, size, pulled):
+    for start in range(0, len(df), size):
+        pulled.append(start)
+        yield df.iloc[start:start + size].reset_index(drop=True)
+
+
+def test_stream_range_stops_past_the_range(synthetic_df):
+    pulled = []
+    selected = pd.concat(stream_range(chunks(synthetic_df, 10, pulled), 'D31-D45'), ignore_index=True)
+    assert list(selected['Data']) == [f'D{number}' for number in range(31, 46)]
+    # D41-D50 is the last chunk read
+    assert pulled == [0, 10, 20, 30, 40]
+
+
+def test_stream_range_reads_files_out_of_order_to_the_end(synthetic_df):
+    shuffled = synthetic_df.sample(frac=1, random_state=3).reset_index(drop=True)
+    pulled = []
+    selected = pd.concat(stream_range(chunks(shuffled, 10, pulled), 'D31-D45'), ignore_index=True)
+    assert selected.equals(select_range(shuffled, 'D31-D45'))
+    assert len(pulled) == 30
@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+
+from rule_engine import compile_rules, load_rules
+from scoring_engine import MALICIOUS, NO_ACTION, SPAM, WARNING, build_record_matrix, score_matrix
+
+POLICY = {
+    'default': 'No Action',
+    'sets': {'auth_failures': ['fail', 'softfail'], 'ssl_ok': ['', 'valid']},
+    'class': [
+        {'name': 'Malicious', 'rule': [
+            {'name': 'hard', 'any': ['sender_known_malicious == 1']},
+            {'name': 'attachment', 'any': ['malicious_attachment_count > 0']},
+        ]},
+        {'name': 'Spam', 'rule': [
+            {'name': 'content', 'all': ['content_spam_score >= 0.6']},
+        ]},
+        {'name': 'Warning', 'rule': [
+            {'name': 'auth', 'any': ['spf_result in auth_failures', 'dkim_result in auth_failures']},
+            {'name': 'reputation', 'all': ['sender_domain_reputation_score < 0.3']},
+            {'name': 'certificate', 'any': ['total_links_detected > 0 and ssl_validity_status not in ssl_ok']},
+            {'name': 'not_one', 'all': ['url_redirect_chain_length != 1']},
+        ]},
+    ],
+}
+
+
+def evaluate(table, *records):
+    return table.evaluate(build_record_matrix(list(records))[0])
+
+
+def test_compile_deduplicates_conditions_and_keeps_class_order():
+    policy = {'class': [
+        {'name': 'Spam', 'rule': [{'name': 'a', 'all': ['content_spam_score >= 0.6']}]},
+        {'name': 'Warning', 'rule': [{'name': 'b', 'any': ['content_spam_score >= 0.6', 'url_count > 3']}]},
+    ]}
+    table = compile_rules(policy)
+    assert [condition.key() for condition in table.conditions] == [
+        ('content_spam_score', '>=', 0.6), ('url_count', '>', 3.0)]
+    assert [(code, prefix, [rule.name for rule in rules]) for code, prefix, rules in table.classes] == [
+        (SPAM, 'spam', ['a']), (WARNING, 'warning', ['b'])]
+    assert table.default == NO_ACTION and table.fast_path is None
+
+
+@pytest.mark.parametrize('policy', [
+    {'class': [{'name': 'Dangerous', 'rule': [{'name': 'a', 'all': ['url_count > 3']}]}]},
+    {'class': [{'name': 'Spam', 'rule': [{'name': 'a', 'all': ['url_count >> 3']}]}]},
+    {'class': [{'name': 'Spam', 'rule': [{'name': 'a'}]}]},
+    {'default': 'Fine', 'class': []},
+])
+def test_compile_rejects_bad_policies(policy):
+    with pytest.raises(ValueError):
+        compile_rules(policy)
+
+
+@pytest.mark.parametrize('record, label, rule', [
+    ({'malicious_attachment_count': 2}, MALICIOUS, 'malicious.attachment'),
+    ({'content_spam_score': 0.6}, SPAM, 'spam.content'),
+    ({'spf_result': 'softfail'}, WARNING, 'warning.auth'),
+    ({'sender_domain_reputation_score': 0.1}, WARNING, 'warning.reputation'),
+    ({'total_links_detected': 1, 'ssl_validity_status': 'expired'}, WARNING, 'warning.certificate'),
+    ({'url_redirect_chain_length': 3}, WARNING, 'warning.not_one'),
+    ({'content_spam_score': 0.59, 'spf_result': 'pass', 'sender_domain_reputation_score': 0.9}, NO_ACTION, None),
+])
+def test_one_rule_per_label(record, label, rule):
+    labels, hits = evaluate(compile_rules(POLICY), record)
+    assert labels.tolist() == [label]
+    assert [key for key, hit in hits.items() if hit[0]] == ([rule] if rule else [])
+
+
+def test_earlier_classes_and_rules_take_precedence():
+    table = compile_rules(POLICY)
+    records = [
+        {'malicious_attachment_count': 1, 'content_spam_score': 0.9, 'spf_result': 'fail'},
+        {'content_spam_score': 0.9, 'spf_result': 'fail', 'sender_domain_reputation_score': 0.1},
+        {'spf_result': 'fail', 'sender_domain_reputation_score': 0.1},
+    ]
+    labels, hits = evaluate(table, *records)
+    assert labels.tolist() == [MALICIOUS, SPAM, WARNING]
+    # Each row is labelled by exactly one rule, the first that fires
+    assert np.array_equal(np.sum(list(hits.values()), axis=0), [1, 1, 1])
+    assert hits['malicious.attachment'][0] and hits['spam.content'][1] and hits['warning.auth'][2]
+
+
+def test_missing_signals_never_match():
+    table = compile_rules(POLICY)
+    missing = {'sender_domain_reputation_score': None, 'url_redirect_chain_length': None,
+               'spf_result': None, 'total_links_detected': 1, 'ssl_validity_status': None}
+    labels, hits = evaluate(table, missing)
+    # Not even '<', '!=' or 'not in'
+    assert labels.tolist() == [NO_ACTION]
+    assert not any(hit.any() for hit in hits.values())
+
+
+def test_values_outside_a_dictionary_never_match_a_set():
+    table = compile_rules(POLICY)
+    # softfail is not in the DKIM dictionary, so it reads as the "other" code
+    assert evaluate(table, {'dkim_result': 'softfail'})[0].tolist() == [NO_ACTION]
+    # ... while "not in" matches an unknown value
+    assert evaluate(table, {'total_links_detected': 1, 'ssl_validity_status': 'banana'})[0].tolist() == [WARNING]
+
+
+def test_policy_file_labels_records_as_score_matrix_does():
+    records = [{'sender_known_malicious': 1}, {'total_components_detected_malicious': 1},
+               {'user_marked_as_spam_before': 1}, {'request_type': 'wire_transfer'}, {}]
+    m, _ = build_record_matrix(records)
+    labels, _ = load_rules().evaluate(m)
+    assert labels.tolist() == [MALICIOUS, MALICIOUS, SPAM, WARNING, NO_ACTION]
+    assert np.array_equal(score_matrix(m)[0], labels)
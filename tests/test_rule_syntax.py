@@ -0,0 +1,56 @@
+import pytest
+
+from quick_classify import classify_record, compile_policy, read_records
+from rule_syntax import ParsedCondition, parse_condition, rule_terms
+from scoring_engine import label_names, score_table
+from signal_loader import load_signal_table
+
+SETS = {'auth_failures': ['fail', 'softfail', 'permerror'], 'levels': [1, 2]}
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('content_spam_score >= 0.6', ParsedCondition('content_spam_score', '>=', 0.6)),
+    ('spf_result in auth_failures', ParsedCondition('spf_result', 'in', ['fail', 'softfail', 'permerror'])),
+    ("dkim_result == 'pass'", ParsedCondition('dkim_result', '==', 'pass')),
+    ('total_ioc_count not  in levels', ParsedCondition('total_ioc_count', 'not in', [1.0, 2.0])),
+    # Catalog aliases resolve to the canonical name
+    ('sender_known_malicios == 1', ParsedCondition('sender_known_malicious', '==', 1.0)),
+])
+def test_parse_condition(text, expected):
+    assert parse_condition(text, SETS) == expected
+
+
+@pytest.mark.parametrize('text', [
+    'content_spam_score ~ 1',
+    'no_such_signal > 1',
+    'spf_result > 1',
+    "spf_result == 'nonsense'",
+    'spf_result == 1',
+    "content_spam_score == 'high'",
+    'content_spam_score in 0.5',
+    'content_spam_score > unknown_set',
+])
+def test_parse_condition_rejects(text):
+    with pytest.raises(ValueError):
+        parse_condition(text, SETS)
+
+
+def test_extra_signals():
+    assert parse_condition('max_behavior_risk >= 0.8', {}, extra_signals=['max_behavior_risk']).signal == \
+        'max_behavior_risk'
+    with pytest.raises(ValueError):
+        parse_condition('max_behavior_risk >= 0.8', {})
+
+
+def test_rule_terms():
+    assert rule_terms({'any': ['a == 1 and b == 2', 'c == 3']}, '') == [['a == 1', 'b == 2'], ['c == 3']]
+    assert rule_terms({'all': ['a == 1', 'b == 2']}, '') == [['a == 1', 'b == 2']]
+    with pytest.raises(ValueError):
+        rule_terms({}, 'rules.toml: Spam.x')
+
+
+def test_quick_path_matches_engine(signal_csv):
+    policy = compile_policy()
+    quick = [classify_record(record, policy)[0] for _, record in read_records(signal_csv)]
+    df = load_signal_table(signal_csv, use_cache=False)
+    assert quick == label_names(score_table(df)[0]).tolist()
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from rule_engine import RULES_PATH, compile_rules, load_rules
+from scoring_engine import (FAST_PATH_HIT, MALICIOUS, build_signal_matrix, score_matrix, score_table,
+                            settle_fast_path)
+
+HARD_INDICATORS = [
+    'sender_known_malicious', 'any_file_hash_malicious', 'final_url_known_malicious', 'return_path_known_malicious',
+    'reply_path_known_malicious', 'smtp_ip_known_malicious', 'domain_known_malicious',
+]
+
+
+def test_fast_path_settles_exactly_the_hard_indicator_rows(synthetic_df):
+    settled, code = settle_fast_path(synthetic_df)
+    assert code == MALICIOUS
+    assert np.array_equal(settled, synthetic_df[HARD_INDICATORS].eq(1).any(axis=1).to_numpy())
+    assert 0 < settled.sum() < len(synthetic_df)
+
+
+def test_two_tier_scoring_matches_full_evaluation(synthetic_df):
+    labels, hits = score_table(synthetic_df)
+    full_labels, full_hits = score_matrix(build_signal_matrix(synthetic_df))
+    assert np.array_equal(labels, full_labels)
+    assert np.array_equal(hits[FAST_PATH_HIT], full_hits[FAST_PATH_HIT])
+    assert np.array_equal(hits[FAST_PATH_HIT], settle_fast_path(synthetic_df)[0])
+    for key, hit in full_hits.items():
+        assert np.array_equal(hits[key], hit), key
+
+
+def test_skipping_the_fast_path_on_unsettled_rows_changes_nothing(synthetic_df):
+    settled, _ = settle_fast_path(synthetic_df)
+    rest = build_signal_matrix(synthetic_df[~settled])
+    table = load_rules()
+    assert np.array_equal(table.evaluate(rest, skip_fast_path=True)[0], table.evaluate(rest)[0])
+
+
+def test_rules_without_a_fast_path(synthetic_df, tmp_path):
+    text = open(RULES_PATH).read().replace('fast_path = true\n', '')
+    path = tmp_path / 'rules.toml'
+    path.write_text(text)
+    settled, _ = settle_fast_path(synthetic_df, str(path))
+    assert not settled.any()
+    labels, hits = score_table(synthetic_df, str(path))
+    assert not hits[FAST_PATH_HIT].any()
+    assert np.array_equal(labels, score_table(synthetic_df)[0])
+
+
+@pytest.mark.parametrize('classes', [
+    # Not the first rule
+    [{'name': 'Malicious', 'rule': [{'name': 'a', 'all': ['url_count > 3']},
+                                    {'name': 'b', 'fast_path': True, 'any': ['sender_known_malicious == 1']}]}],
+    # Not a single-bit test
+    [{'name': 'Malicious', 'rule': [{'name': 'a', 'fast_path': True, 'any': ['malicious_attachment_count > 0']}]}],
+    [{'name': 'Malicious', 'rule': [{'name': 'a', 'fast_path': True,
+                                     'any': ['sender_known_malicious == 1 and domain_known_malicious == 1']}]}],
+])
+def test_invalid_fast_path_rules_are_rejected(classes):
+    with pytest.raises(ValueError):
+        compile_rules({'class': classes})
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+from signal_activation import activation_matrix, high_risk_matrix
+
+TABLE = pd.DataFrame({
+    'Data': ['D1', 'D2', 'D3', 'D4'],
+    'sender_known_malicious': [1, 0, 1, np.nan],
+    'dmarc_enforced': [0, 1, np.nan, 1],
+    'malicious_attachment_count': [0, 2, 1, 0],
+    'content_spam_score': [0.55, 0.8, 0.2, np.nan],
+    'sender_domain_reputation_score': [0.1, 0.2, 0.45, 0.9],
+    'max_suspicious_string_entropy_score': [6.5, 5.0, np.nan, 6.0],
+    'spf_result': ['fail', 'pass', None, 'softfail'],
+})
+SIGNALS = [column for column in TABLE.columns if column != 'Data']
+
+
+def by_signal(matrix):
+    return {name: matrix[:, i].tolist() for i, name in enumerate(SIGNALS)}
+
+
+def test_activation_follows_polarity():
+    signals, active = activation_matrix(TABLE)
+    assert signals == SIGNALS
+    assert by_signal(active) == {
+        'sender_known_malicious': [True, False, True, False],
+        'dmarc_enforced': [True, False, False, False],
+        'malicious_attachment_count': [False, True, True, False],
+        'content_spam_score': [True, True, False, False],
+        'sender_domain_reputation_score': [True, True, True, False],
+        'max_suspicious_string_entropy_score': [True, False, False, True],
+        'spf_result': [True, False, False, True],
+    }
+
+
+def test_high_risk_is_positive_evidence_only():
+    high_risk = high_risk_matrix(TABLE, SIGNALS)
+    assert by_signal(high_risk) == {
+        'sender_known_malicious': [True, False, True, False],
+        # A missing protection is active but not high-risk
+        'dmarc_enforced': [False, False, False, False],
+        'malicious_attachment_count': [False, True, True, False],
+        'content_spam_score': [False, True, False, False],
+        'sender_domain_reputation_score': [True, True, False, False],
+        'max_suspicious_string_entropy_score': [True, False, False, True],
+        'spf_result': [False, False, False, False],
+    }
+    _, active = activation_matrix(TABLE)
+    assert not (high_risk & ~active).any()
+
+
+def test_categorical_triggers_are_the_rule_sets():
+    table = pd.DataFrame({
+        'spf_result': ['temperror', 'permerror', 'none'],
+        'tls_version': ['SSL', 'TLS 1.2', None],
+        'ssl_validity_status': ['expired', 'valid', ''],
+        'unique_parent_process_names': ['cmd.exe', 'powershell.exe', 'winword.exe'],
+    })
+    _, active = activation_matrix(table)
+    assert active.tolist() == [[False, True, True, False], [True, False, False, False], [False, False, False, False]]
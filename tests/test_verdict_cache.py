@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+
+from batch_classify import classify_store, classify_stream, classify_table
+from parallel_classify import score_store_parallel, score_table_parallel
+from scoring_engine import FAST_PATH_HIT, build_signal_matrix, label_names, score_table
+from signal_cache import open_cached_store
+from signal_loader import load_signal_table
+from signal_schema import DATA_ID
+from verdict_cache import VerdictCache, score_store_cached, score_table_cached
+
+
+def test_cached_verdicts_match_score_table(synthetic_df):
+    expected, hits = score_table(synthetic_df)
+    cache = VerdictCache()
+
+    labels, cached_hits = cache.score(build_signal_matrix(synthetic_df))
+    assert np.array_equal(labels, expected)
+    assert np.array_equal(cached_hits[FAST_PATH_HIT], hits[FAST_PATH_HIT])
+    # The last 100 rows repeat the first 100
+    assert cache.hits >= 100
+    misses = cache.misses
+
+    # A second pass is served from the cache alone
+    labels, _ = cache.score(build_signal_matrix(synthetic_df))
+    assert np.array_equal(labels, expected)
+    assert cache.misses == misses
+
+
+def test_key_ignores_differences_the_rules_cannot_see(synthetic_df):
+    rows = synthetic_df.iloc[[0, 0, 0]].copy()
+    rows['content_spam_score'] = np.array([0.1, 0.2, 0.6], dtype=np.float32)
+    keys = VerdictCache().spec.key_words(build_signal_matrix(rows))
+    # content_spam_score >= 0.6 is the only rule on the score
+    assert np.array_equal(keys[0], keys[1])
+    assert not np.array_equal(keys[0], keys[2])
+
+
+def test_bounded_cache_evicts_and_stays_correct(synthetic_df):
+    cache = VerdictCache(max_entries=10)
+    for start in range(0, len(synthetic_df), 50):
+        chunk = synthetic_df.iloc[start:start + 50]
+        labels, _ = cache.score(build_signal_matrix(chunk))
+        assert np.array_equal(labels, score_table(chunk)[0])
+    assert len(cache) == 10 and cache.evictions > 0
+
+
+def test_parallel_and_cached_paths_agree(signal_csv):
+    df = load_signal_table(signal_csv, use_cache=False)
+    expected = score_table(df)[0]
+    store = open_cached_store(signal_csv)
+
+    assert np.array_equal(score_table_parallel(df, workers=2)[0], expected)
+    assert np.array_equal(score_store_parallel(store, workers=2)[0], expected)
+    assert np.array_equal(classify_table(df, cache=VerdictCache()), label_names(expected))
+    assert np.array_equal(classify_store(store, cache=VerdictCache()), label_names(expected))
+
+
+def test_cached_paths_keep_the_fast_path_and_workers(signal_csv):
+    df = load_signal_table(signal_csv, use_cache=False)
+    expected, hits = score_table(df)
+    store = open_cached_store(signal_csv)
+    for workers in (1, 2):
+        for score in (lambda cache: score_table_cached(df, cache, workers),
+                      lambda cache: score_store_cached(store, cache, workers)):
+            cache = VerdictCache()
+            labels, cached_hits = score(cache)
+            assert np.array_equal(labels, expected)
+            assert np.array_equal(cached_hits[FAST_PATH_HIT], hits[FAST_PATH_HIT])
+            # Rows settled by the fast path never reach the cache
+            assert cache.hits + cache.misses == len(df) - hits[FAST_PATH_HIT].sum()
+
+
+def test_streaming_with_cache_matches_score_table(signal_csv, tmp_path):
+    df = load_signal_table(signal_csv, use_cache=False)
+    output = str(tmp_path / 'outcome.csv')
+    classify_stream(signal_csv, output, chunk_size=7, cache=VerdictCache())
+    written = pd.read_csv(output, header=None, names=[DATA_ID, 'Classification'])
+    assert list(written[DATA_ID]) == list(df[DATA_ID])
+    assert np.array_equal(written['Classification'].to_numpy(), label_names(score_table(df)[0]))
@@ -0,0 +1,316 @@
+"""
+Content-addressed memoization of verdicts for rows the rules cannot tell apart.
+
+Campaign traffic repeats the same signals across many emails, but rarely to
+the last bit of every score. A row's key is built from the raw signal columns
+the loaded rule file (rule_engine.py) reads, each quantized to what the rules
+can see of it:
+  - boolean signals tested as "== 1": the packed words, masked to those bits
+  - categorical signals: the class of the dictionary code, codes that pass
+    the same rule lookups sharing a class
+  - numeric signals: the position of the value among the thresholds the rules
+    compare the signal with (below, equal to or above each one), or NaN
+Each position is counted with the comparison operators the engine uses, so
+values in one position pass exactly the same conditions. The quantized
+columns are packed into 64-bit words as mixed-radix digits; with the current
+rules.toml the whole key is two words. Keys are exact, not hashes: rows with
+the same key always get the same verdict, and signals no rule reads and the
+Data ID never change it. A verdict is computed once per distinct key:
+  - within a batch, rows with the same key are collapsed and only one is evaluated
+  - across batches, verdicts are kept in a size-bounded LRU table with hit,
+    miss and eviction counters
+
+score_table_cached and score_store_cached keep the tier-one fast path (rows
+with a hard indicator are settled before any key is built) and evaluate the
+uncached rows across a process pool when asked to.
+
+A key only has a meaning under the rule file it was built from, so a
+VerdictCache belongs to one rule file: verdicts from another policy are never
+served.
+"""
+
+import collections
+import threading
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from rule_engine import RULES_PATH, load_rules
+from scoring_engine import FAST_PATH_HIT, build_signal_matrix, score_matrix, score_table, settle_fast_path
+
+DEFAULT_MAX_ENTRIES = 1_000_000
+
+WORD_LIMIT = 1 << 64
+
+
+def _mix(h):
+    # splitmix64 finalizer, in place; uint64 arithmetic wraps
+    h ^= h >> np.uint64(30)
+    h *= np.uint64(0xBF58476D1CE4E5B9)
+    h ^= h >> np.uint64(27)
+    h *= np.uint64(0x94D049BB133111EB)
+    h ^= h >> np.uint64(31)
+    return h
+
+
+def _code_classes(conditions):
+    """Category code -> class of the codes that pass the same rule lookups"""
+    _, classes = np.unique(np.stack([condition.lookup for condition in conditions], axis=1), axis=0,
+                           return_inverse=True)
+    return classes.ravel().astype(np.uint8)
+
+
+def _thresholds(conditions):
+    """Distinct values a numeric signal is compared with, as the engine compares them"""
+    values = set()
+    for condition in conditions:
+        if condition.op in ('in', 'not in'):
+            # np.isin compares against a float64 array
+            values.update(np.float64(value) for value in condition.value)
+        else:
+            values.add(condition.value)
+    return sorted(values)
+
+
+def numeric_positions(column, thresholds):
+    """Position of every value among the thresholds, as uint8.
+
+    Each threshold adds 0 below it, 1 at it and 2 above it, and NaN gets
+    2 * len(thresholds) + 1. Every term only grows with the value, so two
+    values with the same sum fall on the same side of every threshold.
+    """
+    positions = np.isnan(column).astype(np.uint8)
+    positions *= np.uint8(2 * len(thresholds) + 1)
+    for threshold in thresholds:
+        positions += column > threshold
+        positions += column >= threshold
+    return positions
+
+
+class KeySpec:
+    """How a rule file (a rule_engine.DecisionTable) quantizes the signals of a row"""
+
+    def __init__(self, table):
+        self.bit_signals = sorted({condition.signal for condition in table.conditions if condition.bit_test})
+        grouped = {}
+        for condition in table.conditions:
+            if not condition.bit_test:
+                grouped.setdefault(condition.signal, []).append(condition)
+        self.categorical = {signal: _code_classes(conditions) for signal, conditions in sorted(grouped.items())
+                            if conditions[0].categorical}
+        self.numeric = {signal: _thresholds(conditions) for signal, conditions in sorted(grouped.items())
+                        if not conditions[0].categorical}
+
+        # Mixed-radix digits: (signal, radix), packed into words whose radix product stays below 2**64
+        digits = [(signal, int(classes.max()) + 1) for signal, classes in self.categorical.items()]
+        digits += [(signal, 2 * len(thresholds) + 2) for signal, thresholds in self.numeric.items()]
+        self.word_digits = []
+        capacity = 0
+        for signal, radix in digits:
+            if not self.word_digits or capacity * radix > WORD_LIMIT:
+                self.word_digits.append([])
+                capacity = 1
+            self.word_digits[-1].append((signal, radix))
+            capacity *= radix
+
+    def _digit(self, m, signal):
+        if signal in self.categorical:
+            return self.categorical[signal][m.code(signal)]
+        return numeric_positions(m.num(signal), self.numeric[signal])
+
+    def key_words(self, m):
+        """(n, words) uint64 key of every row of a SignalMatrix: the masked boolean words, then the packed digits"""
+        mask = m.booleans.mask(self.bit_signals)
+        used = np.flatnonzero(mask)
+        keys = np.empty((len(m), len(used) + len(self.word_digits)), dtype=np.uint64)
+        for i, word in enumerate(used):
+            np.bitwise_and(m.booleans.words[:, word], mask[word], out=keys[:, i])
+        for i, digits in enumerate(self.word_digits, len(used)):
+            packed = np.zeros(len(m), dtype=np.uint64)
+            for signal, radix in digits:
+                packed *= np.uint64(radix)
+                packed += self._digit(m, signal)
+            keys[:, i] = packed
+        return keys
+
+    def layout(self, m):
+        """Tag of the numeric column dtypes: the same value may sit differently against a threshold as int or float"""
+        return zlib.crc32(' '.join(m.num(signal).dtype.str for signal in self.numeric).encode())
+
+
+def distinct_rows(keys):
+    """(first row of each distinct key, row -> distinct index) of an (n, words) key array"""
+    h = np.zeros(len(keys), dtype=np.uint64)
+    for i in range(keys.shape[1]):
+        h ^= keys[:, i]
+        _mix(h)
+    inverse, uniques = pd.factorize(h)
+    first = np.empty(len(uniques), dtype=np.int64)
+    # Assigned in reverse so each key keeps its first row
+    first[inverse[::-1]] = np.arange(len(keys) - 1, -1, -1)
+    if not (keys[first[inverse]] == keys).all():
+        # Distinct keys share a hash: group by the keys themselves
+        rows = np.ascontiguousarray(keys).view(np.dtype((np.void, keys.shape[1] * 8))).ravel()
+        _, first, inverse = np.unique(rows, return_index=True, return_inverse=True)
+        inverse = inverse.ravel()
+    return first, inverse
+
+
+class VerdictCache:
+    """LRU table of key -> (label code, settled by the fast path) for one rule file, with counters.
+
+    Counters are per row: a hit is a row whose verdict did not need the rules
+    (cached, or a duplicate of another row in the same batch), a miss a row the
+    rules evaluated. Rows settled by the fast path before the cache is asked
+    are not counted.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, rules_path=None):
+        self.max_entries = max_entries
+        self.rules_path = rules_path
+        self.spec = KeySpec(load_rules(rules_path or RULES_PATH))
+        self.entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def stats(self):
+        rows = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / rows if rows else 0.0,
+        }
+
+    def _get(self, keys):
+        """Cached (labels, fast-path flags, found mask) for distinct keys"""
+        labels = np.zeros(len(keys), dtype=np.int8)
+        fast = np.zeros(len(keys), dtype=bool)
+        found = np.zeros(len(keys), dtype=bool)
+        if not self.entries:
+            return labels, fast, found
+        with self._lock:
+            entries = [self.entries.get(key) for key in keys]
+            for i, entry in enumerate(entries):
+                if entry is not None:
+                    self.entries.move_to_end(keys[i])
+                    labels[i], fast[i] = entry
+                    found[i] = True
+        return labels, fast, found
+
+    def _put(self, keys, labels, fast):
+        # Only the last max_entries keys would survive eviction anyway
+        skip = max(len(keys) - self.max_entries, 0)
+        with self._lock:
+            self.evictions += skip
+            self.entries.update(zip(keys[skip:], zip(labels[skip:].tolist(), fast[skip:].tolist())))
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def score(self, m, evaluate=None):
+        """Label every row of a SignalMatrix, evaluating the rules once per uncached distinct row.
+
+        evaluate(rows) labels the given rows of m as (label codes, fast-path
+        mask); by default score_matrix runs on them in this process. Returns
+        (label codes, {FAST_PATH_HIT: mask}) like parallel_classify.score_store_parallel.
+        """
+        if len(m) == 0:
+            return np.empty(0, dtype=np.int8), {FAST_PATH_HIT: np.zeros(0, dtype=bool)}
+        keys = self.spec.key_words(m)
+        first, inverse = distinct_rows(keys)
+        # The layout tag is prepended so keys of differently typed matrices never meet
+        tag = self.spec.layout(m).to_bytes(4, 'little')
+        rows = np.ascontiguousarray(keys[first]).view(np.dtype((np.void, keys.shape[1] * 8))).ravel().tolist()
+        distinct = [tag + key for key in rows]
+        labels, fast, found = self._get(distinct)
+
+        missing = np.flatnonzero(~found)
+        if len(missing):
+            new_labels, new_fast = (evaluate or self._evaluate(m))(first[missing])
+            labels[missing] = new_labels
+            fast[missing] = new_fast
+            self._put([distinct[i] for i in missing], new_labels, new_fast)
+
+        with self._lock:
+            self.misses += len(missing)
+            self.hits += len(m) - len(missing)
+        return labels[inverse], {FAST_PATH_HIT: fast[inverse]}
+
+    def _evaluate(self, m):
+        def evaluate(rows):
+            labels, hits = score_matrix(m.take(rows), self.rules_path)
+            return labels, hits[FAST_PATH_HIT]
+        return evaluate
+
+
+def score_table_cached(df, cache, workers=1):
+    """score_table through a VerdictCache.
+
+    Rows with a hard indicator are settled by the fast path as in
+    score_table; the cache keys the rest, and the distinct uncached rows are
+    evaluated across a process pool of workers when workers > 1.
+    """
+    settled, code = settle_fast_path(df, cache.rules_path)
+    labels = np.full(len(df), code, dtype=np.int8)
+    rest = np.flatnonzero(~settled)
+    if len(rest) == 0:
+        return labels, {FAST_PATH_HIT: settled}
+    part = df.iloc[rest] if settled.any() else df
+
+    def evaluate(rows):
+        if workers > 1:
+            from parallel_classify import score_table_parallel
+            part_labels, _ = score_table_parallel(part.iloc[rows], workers)
+        else:
+            part_labels, _ = score_table(part.iloc[rows], cache.rules_path)
+        # The fast-path rows are already settled, so none of these are
+        return part_labels, np.zeros(len(rows), dtype=bool)
+
+    labels[rest] = cache.score(build_signal_matrix(part), evaluate)[0]
+    return labels, {FAST_PATH_HIT: settled}
+
+
+def score_store_cached(store, cache, workers=1):
+    """score_store_parallel through a VerdictCache (see score_table_cached).
+
+    The fast path is read from the store's packed boolean words.
+    """
+    m = store.matrix()
+    fast_path = load_rules(cache.rules_path or RULES_PATH).fast_path
+    settled = np.zeros(len(m), dtype=bool)
+    code = 0
+    if fast_path is not None:
+        settled = m.booleans.any(m.booleans.mask(fast_path.signals))
+        code = fast_path.code
+    labels = np.full(len(m), code, dtype=np.int8)
+    rest = np.flatnonzero(~settled)
+    if len(rest) == 0:
+        return labels, {FAST_PATH_HIT: settled}
+    part = m.take(rest) if settled.any() else m
+
+    def evaluate(rows):
+        if workers > 1:
+            from parallel_classify import score_table_parallel
+            part_labels, _ = score_table_parallel(store.frame(rest[rows]), workers)
+            return part_labels, np.zeros(len(rows), dtype=bool)
+        part_labels, _ = score_matrix(part.take(rows), cache.rules_path)
+        return part_labels, np.zeros(len(rows), dtype=bool)
+
+    labels[rest] = cache.score(part, evaluate)[0]
+    return labels, {FAST_PATH_HIT: settled}
+
+
+def add_verdict_cache_argument(parser, note=None):
+    """Add --verdict-cache [ENTRIES] (off unless given) to a command's argument parser"""
+    text = f'memoize verdicts per distinct signal vector, keeping up to ENTRIES (default {DEFAULT_MAX_ENTRIES})'
+    parser.add_argument('--verdict-cache', type=int, nargs='?', const=DEFAULT_MAX_ENTRIES, default=0,
+                        metavar='ENTRIES', help=text + (f'; {note}' if note else ''))